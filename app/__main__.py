@@ -0,0 +1,21 @@
+"""
+`python -m app`: serve the API on an io_uring/uvloop event loop when available.
+
+The uvicorn CLI builds its loop before importing the app, so the policy has to
+be installed here, ahead of uvicorn, with uvicorn's own loop setup disabled.
+"""
+
+import os
+
+import uvicorn
+
+from app.core.event_loop import install_event_loop_policy
+
+if __name__ == "__main__":
+    install_event_loop_policy()
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "127.0.0.1"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="none",
+    )
@@ -0,0 +1,53 @@
+"""
+Process-wide OpenAI client and Serper session factory.
+
+One AsyncOpenAI over one pooled httpx client, so every agent run and tool call
+reuses warm keep-alive connections instead of paying a TLS handshake per call.
+HTTP/2 is used when the optional `h2` package is installed.
+
+Serper fan-outs open one httpx client per tool call (its connections are bound
+to the running loop, so it is not process-wide) and share it across every
+query and retry in that call. With `h2` installed, all of a fan-out's requests
+are multiplexed as HTTP/2 streams over a single TLS connection.
+"""
+
+import os
+from functools import lru_cache
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+SERPER_MAX_CONNECTIONS = int(os.getenv("SERPER_MAX_CONNECTIONS", "32"))
+
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> AsyncOpenAI:
+    """Shared AsyncOpenAI client (built on first use, after the env is loaded)."""
+    http_client = DefaultAsyncHttpxClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+        ),
+    )
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+
+def serper_session() -> httpx.AsyncClient:
+    """Pooled client for one Serper fan-out; use as `async with serper_session() as s`."""
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        limits=httpx.Limits(
+            max_connections=SERPER_MAX_CONNECTIONS,
+            max_keepalive_connections=SERPER_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+        timeout=30,
+    )
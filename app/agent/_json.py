@@ -0,0 +1,54 @@
+"""
+Stable JSON encoding for prompt payloads, and fast decoding of API responses.
+
+Uses orjson (C extension, keys sorted via OPT_SORT_KEYS) when it is installed,
+otherwise the stdlib encoder configured to produce the same compact, key-sorted,
+UTF-8 output, so prompts are byte-identical either way. `loads` is orjson's
+decoder when available (accepts str or bytes), else json.loads.
+
+Also home to the jargon prompt payload shared by every agent (jargon_json_for).
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def dumps_sorted(obj: Any) -> str:
+    """Serialize obj to a compact JSON string with sorted keys."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def dump_jargon_for_prompt(jargon: Any) -> str:
+    """
+    Normalizes JargonQueryResult (Pydantic) or dict to a stable JSON string.
+    """
+    if jargon is None:
+        return "{}"
+    if hasattr(jargon, "model_dump"):
+        return dumps_sorted(jargon.model_dump())
+    if isinstance(jargon, dict):
+        return dumps_sorted(jargon)
+    return "{}"
+
+
+def jargon_json_for(ctx: Any, jargon: Any) -> str:
+    """
+    dump_jargon_for_prompt memoized on the StateContext: pre-screener, planner
+    and synthesizer dump the same jargon object, so it is serialized once per
+    session. Keyed on identity, so assigning a new ctx.jargon_translation re-dumps.
+    """
+    cached = ctx._jargon_json_cache
+    if cached is not None and cached[0] is jargon:
+        return cached[1]
+    out = dump_jargon_for_prompt(jargon)
+    ctx._jargon_json_cache = (jargon, out)
+    return out
@@ -0,0 +1,59 @@
+"""
+Compiled prompt templates.
+
+Prompts mark their dynamic slots with {{name}} placeholders. A template is split
+at those markers once (at import) and rendered with a single join, instead of
+one full-string .replace() pass per placeholder on every call. compile_renderer
+goes one step further and generates a render function specialized to the
+template, so the per-call work is just the join.
+"""
+
+import keyword
+import re
+from typing import Callable, Tuple
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+
+def compile_template(text: str) -> Tuple[str, ...]:
+    """
+    Split text into alternating literal / placeholder-name segments:
+    (literal, name, literal, name, ..., literal).
+    """
+    return tuple(_PLACEHOLDER.split(text))
+
+
+def render_template(parts: Tuple[str, ...], **values: str) -> str:
+    """
+    Render a compiled template. Placeholders without a value are kept verbatim,
+    matching what an un-applied .replace() would have left behind.
+    """
+    return "".join(
+        part if i % 2 == 0 else values.get(part, "{{%s}}" % part)
+        for i, part in enumerate(parts)
+    )
+
+
+def compile_renderer(text: str) -> Callable[..., str]:
+    """
+    Compile text into a specialized render function, generated once at import:
+    each placeholder becomes a keyword argument and the body is a single join
+    over a fixed tuple, so a call does no template walking or dict lookups.
+    Missing placeholders render verbatim, as in render_template.
+    """
+    parts = compile_template(text)
+    names = list(dict.fromkeys(parts[1::2]))
+    if not all(n.isidentifier() and not keyword.iskeyword(n) for n in names):
+        return lambda **values: render_template(parts, **values)
+
+    params = ", ".join(f"{n}={'{{%s}}' % n!r}" for n in names)
+    items = ", ".join(
+        f"_P[{i}]" if i % 2 == 0 else parts[i]
+        for i in range(len(parts))
+        if i % 2 or parts[i]
+    )
+    src = f"def render(*, {params}, **_):\n    return ''.join(({items},))\n" if names else \
+        "def render(**_):\n    return _P[0]\n"
+    ns = {"_P": parts}
+    exec(src, ns)
+    return ns["render"]
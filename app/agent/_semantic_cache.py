@@ -0,0 +1,80 @@
+"""
+Similarity-keyed response cache.
+
+Maps embedding vectors to cached values and answers a lookup with the value of
+the most similar stored vector, if its cosine similarity clears a threshold.
+Vectors are L2-normalized on the way in, so similarity is a plain dot product.
+Entries expire after a TTL and the oldest are evicted past max_size.
+
+Scoring uses numpy (one matrix-vector product) when it is installed, otherwise a
+pure-Python dot product per entry; keep max_size modest without numpy.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Generic, List, Optional, Sequence, Tuple, TypeVar
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+V = TypeVar("V")
+
+
+def _normalize(vec: Sequence[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return tuple(x / norm for x in vec)
+
+
+class SemanticCache(Generic[V]):
+    def __init__(self, threshold: float, max_size: int, ttl: float) -> None:
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, Tuple[float, ...], V]]" = OrderedDict()
+        self._next_id = 0
+        self._matrix = None  # numpy snapshot of the live vectors, rebuilt on change
+        self._matrix_ids: List[int] = []
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        stale = [k for k, (stored_at, _, _) in self._entries.items() if stored_at < cutoff]
+        for k in stale:
+            del self._entries[k]
+        if stale:
+            self._matrix = None
+
+    def get(self, vec: Sequence[float]) -> Optional[V]:
+        """Value of the most similar live entry at or above threshold, else None."""
+        self._expire()
+        if not self._entries:
+            return None
+        q = _normalize(vec)
+        if np is not None:
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries)
+                self._matrix = np.array([self._entries[k][1] for k in self._matrix_ids])
+            scores = self._matrix @ np.asarray(q)
+            i = int(scores.argmax())
+            best_id, best = self._matrix_ids[i], float(scores[i])
+        else:
+            best_id, best = None, -1.0
+            for k, (_, v, _) in self._entries.items():
+                score = sum(a * b for a, b in zip(v, q))
+                if score > best:
+                    best_id, best = k, score
+        if best < self.threshold:
+            return None
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][2]
+
+    def put(self, vec: Sequence[float], value: V) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[self._next_id] = (time.monotonic(), _normalize(vec), value)
+        self._next_id += 1
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._matrix = None
@@ -0,0 +1,68 @@
+"""
+Incremental parsing of streamed structured output.
+
+Agents that stream JSON (the synthesizer's findings, the retriever's evidence)
+feed text deltas to ArrayItemScanner and act on each array item as soon as it
+is complete, instead of waiting for the whole document.
+"""
+
+from typing import List
+
+from app.agent._json import loads
+
+
+class ArrayItemScanner:
+    """
+    Incremental scanner over streamed JSON text: returns each object of the array
+    under `key` as soon as its closing brace arrives (string/escape aware), so
+    callers can act on early items before the whole document is generated.
+    """
+
+    def __init__(self, key: str):
+        self._marker = f'"{key}"'
+        self._buf = ""
+        self._pos = -1        # scan position once inside the array, -1 before
+        self._depth = 0       # object nesting depth inside the array
+        self._start = 0       # start of the current top-level item
+        self._in_str = False
+        self._esc = False
+        self._done = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        if self._done:
+            return []
+        self._buf += chunk
+        if self._pos < 0:
+            k = self._buf.find(self._marker)
+            b = self._buf.find("[", k + len(self._marker)) if k != -1 else -1
+            if b == -1:
+                return []
+            self._pos = b + 1
+        items: List[dict] = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+            elif c == '"':
+                self._in_str = True
+            elif c == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(loads(buf[self._start:i + 1]))
+            elif c == "]" and self._depth == 0:
+                self._done = True
+                break
+            i += 1
+        self._pos = i
+        return items
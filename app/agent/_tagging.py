@@ -1,82 +1,185 @@
-from typing import Dict, List, Set, Any
+from collections import namedtuple
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, FrozenSet, List, Tuple, Any
 import re
 
-# Canonical mappings
+from app.agent.schemas.jargons import JargonQueryResult
+
+# Optional: google-re2 compiles the tag alternation to a DFA (linear time, no
+# backtracking). Falls back to the stdlib engine when it isn't installed.
+try:
+    import re2 as _re
+except ImportError:
+    _re = re
+
+# Canonical mappings (frozen: shared, read-only tag sets)
 CANON = {
-    "ASL": {"child_safety", "age_gating"},
-    "SNOWCAP": {"child_safety", "policy_framework"},
-    "PF": {"personalization", "recommendation"},
-    "CUSTOMAPI": {"data_integration", "internal_api"},
-    "XRAY": {"test_management", "qa_process"},
-    "GH": {"geo_enforcement", "jurisdiction"},
-    "ECHOTRACE": {"audit_logging", "traceability"},
-    "SHADOWMODE": {"silent_rollout", "analytics_only"},
-    "UTAH SOCIAL MEDIA REGULATION ACT": {"jurisdiction_ut", "state_law", "minor_protection"},
+    "ASL": frozenset({"child_safety", "age_gating"}),
+    "SNOWCAP": frozenset({"child_safety", "policy_framework"}),
+    "PF": frozenset({"personalization", "recommendation"}),
+    "CUSTOMAPI": frozenset({"data_integration", "internal_api"}),
+    "XRAY": frozenset({"test_management", "qa_process"}),
+    "GH": frozenset({"geo_enforcement", "jurisdiction"}),
+    "ECHOTRACE": frozenset({"audit_logging", "traceability"}),
+    "SHADOWMODE": frozenset({"silent_rollout", "analytics_only"}),
+    "UTAH SOCIAL MEDIA REGULATION ACT": frozenset({"jurisdiction_ut", "state_law", "minor_protection"}),
 }
-CRITICAL = {"child_safety", "age_gating", "personalization", "jurisdiction_ut"}
+CRITICAL = frozenset({"child_safety", "age_gating", "personalization", "jurisdiction_ut"})
+
+# Plain-word keywords: found with str.find on the lower-cased text plus a
+# one-character boundary check, which is far cheaper than a regex scan.
+# ("login" also covers "login restriction".)
+LITERALS = [
+    ("utah", frozenset({"jurisdiction_ut", "state_law"})),
+    ("curfew", frozenset({"curfew"})),
+    ("login", frozenset({"login_restriction"})),
+]
 
+# Keywords that need regex features. Bodies only: the word boundaries are
+# applied once around the whole alternation (see _COMBINED).
 PATTERNS = [
-    (r"\butah\b", {"jurisdiction_ut", "state_law"}),
-    (r"\bcurfew\b", {"curfew"}),
-    (r"\bunder[-\s]?18\b|\bminor[s]?\b", {"minor_protection"}),
-    (r"\blogin restriction\b|\blogin\b", {"login_restriction"}),
+    ("minor", r"under[-\s]?18|minors?", frozenset({"minor_protection"})),
 ]
 
-def _norm(s: str) -> str:
-    return (s or "").strip().upper()
+# All PATTERNS fused into one named-group alternation, compiled once at import,
+# so the text is scanned in a single pass; m.lastgroup says which pattern hit.
+# Sharing one leading/trailing \b means each position is boundary-checked once
+# before the keyword branches are tried, like a keyword trie. It runs on the
+# already lower-cased text, so no case-insensitive matching is needed: one
+# text.lower() copy is cheaper than re.IGNORECASE folding every character the
+# scanner visits (~1.5-2x slower on CPython 3.13, short and long texts alike),
+# and the lowered text is shared with the LITERALS str.find pass.
+_COMBINED = _re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{rx})" for name, rx, _ in PATTERNS) + r")\b"
+)
+
+# Internally a tag set is an int bitmask over the fixed tag vocabulary, so union,
+# intersection and difference are single integer ops. Bits are assigned in sorted
+# tag order, so walking the set bits low-to-high yields names already sorted.
+ALL_TAGS: Tuple[str, ...] = tuple(sorted(
+    CRITICAL.union(*CANON.values(), *(add for _, add in LITERALS), *(add for _, _, add in PATTERNS))
+))
+TAG_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(ALL_TAGS)}
+
+def _mask(tags: FrozenSet[str]) -> int:
+    m = 0
+    for t in tags:
+        m |= TAG_BITS[t]
+    return m
+
+CRITICAL_MASK = _mask(CRITICAL)
+# Case-insensitive view of CANON, built once so lookups only need casefold().
+CANON_CI = {k.casefold(): _mask(v) for k, v in CANON.items()}
+_LITERAL_MASKS = [(word, _mask(add)) for word, add in LITERALS]
+_GROUP_TAGS = {name: _mask(add) for name, _, add in PATTERNS}
+# Every tag text scanning can produce; once all are found the scan can stop.
+_TEXT_ALL = _mask(frozenset().union(*(add for _, add in LITERALS), *(add for _, _, add in PATTERNS)))
+
+# Tags travel between helpers as (must, nice) bitmasks; names are materialized,
+# already sorted, only when a bundle is serialized for a prompt (tag_dict).
+TagBundle = namedtuple("TagBundle", "must nice")
+EMPTY_BUNDLE = TagBundle(0, 0)
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+def _has_word(text: str, word: str) -> bool:
+    """True if word occurs in text as a whole word (text already lower-cased)."""
+    n = len(word)
+    i = text.find(word)
+    while i != -1:
+        j = i + n
+        if (i == 0 or not _is_word_char(text[i - 1])) and (j == len(text) or not _is_word_char(text[j])):
+            return True
+        i = text.find(word, i + 1)
+    return False
+
+@lru_cache(maxsize=256)
+def _names(mask: int) -> Tuple[str, ...]:
+    """Tag names for a bitmask, in sorted order (bit order == name order)."""
+    return tuple(name for i, name in enumerate(ALL_TAGS) if mask >> i & 1)
+
+def _partition(tags: int) -> TagBundle:
+    """Split a tag mask into a (must, nice) bundle."""
+    if not tags:
+        return EMPTY_BUNDLE
+    return TagBundle(tags & CRITICAL_MASK, tags & ~CRITICAL_MASK)
 
-def _sorted(xs: Set[str]) -> List[str]:
-    return sorted(xs)
+def tag_dict(bundle: TagBundle) -> Dict[str, Tuple[str, ...]]:
+    """Sorted, JSON-ready view of a bundle: {'must': (...), 'nice': (...)}."""
+    return {"must": _names(bundle.must), "nice": _names(bundle.nice)}
 
 def _iter_terms(jargon: object) -> List[str]:
     """
-    Duck-type over either:
-      - a Pydantic model with .detected_terms / .searched_terms (JargonQueryResult), or
+    Collect non-empty term strings from either:
+      - a JargonQueryResult (Pydantic) with .detected_terms / .searched_terms, or
       - a dict shaped like {'detected_terms': [...], 'searched_terms': [...]}, or
       - None.
+    Dispatches on type once, then walks both buckets in a single chained pass.
     """
-    out: List[str] = []
-    if jargon is None:
-        return out
-
     # Pydantic model case
-    if hasattr(jargon, "detected_terms") and hasattr(jargon, "searched_terms"):
-        for t in getattr(jargon, "detected_terms") or []:
-            out.append(getattr(t, "term", "") or "")
-        for t in getattr(jargon, "searched_terms") or []:
-            out.append(getattr(t, "term", "") or "")
-
-    # Dict case
-    elif isinstance(jargon, dict):
-        for t in (jargon.get("detected_terms") or []):
-            out.append((t.get("term") or ""))
-        for t in (jargon.get("searched_terms") or []):
-            # searched terms may be richer objects (term/definition/sources)
-            out.append((t.get("term") or ""))
-
-    return [s for s in out if s]  # drop empties
-
-def jargon_to_tags(jargon: object) -> Dict[str, List[str]]:
-    tags: Set[str] = set()
-    for term in _iter_terms(jargon):
-        tags |= CANON.get(_norm(term), set())
-    must = {t for t in tags if t in CRITICAL}
-    nice = tags - must
-    return {"must": _sorted(must), "nice": _sorted(nice)}
-
-def derive_text_tags(text: str) -> Dict[str, List[str]]:
-    tags: Set[str] = set()
-    t = (text or "").lower()
-    for rx, add in PATTERNS:
-        if re.search(rx, t):
+    if isinstance(jargon, JargonQueryResult):
+        det = jargon.detected_terms or ()
+        src = jargon.searched_terms or ()
+        return [t.term for t in chain(det, src) if t.term]
+
+    # Dict case (searched terms may be richer objects: term/definition/sources)
+    if isinstance(jargon, dict):
+        det = jargon.get("detected_terms") or ()
+        src = jargon.get("searched_terms") or ()
+        return [term for term in (t.get("term") for t in chain(det, src)) if term]  # drop empties
+
+    return []
+
+# Both tag derivations are pure, and the planner/synth steps of a session hit
+# them with the same inputs, so the raw masks are memoized; bundles are ints,
+# so cached values can be handed out as-is.
+@lru_cache(maxsize=1024)
+def _terms_mask(terms: Tuple[str, ...]) -> int:
+    tags = 0
+    for term in terms:
+        tags |= CANON_CI.get(term, 0)
+    return tags
+
+def _jargon_mask(jargon: object) -> int:
+    # The same acronym often shows up in both detected_terms and searched_terms;
+    # a set collapses duplicates before the lookup and makes the cache key canonical.
+    keys = {t.strip().casefold() for t in _iter_terms(jargon)}
+    return _terms_mask(tuple(sorted(keys)))
+
+@lru_cache(maxsize=2048)
+def _text_mask(text: str) -> int:
+    tags = 0
+    text = text.lower()
+    for word, add in _LITERAL_MASKS:
+        if _has_word(text, word):
             tags |= add
-    must = {t for t in tags if t in CRITICAL}
-    nice = tags - must
-    return {"must": _sorted(must), "nice": _sorted(nice)}
-
-def merge_tag_sets(a: Dict[str, List[str]], b: Dict[str, List[str]]) -> Dict[str, List[str]]:
-    am, an = set(a.get("must", [])), set(a.get("nice", []))
-    bm, bn = set(b.get("must", [])), set(b.get("nice", []))
-    must = am | bm
-    nice = (an | bn) - must
-    return {"must": sorted(must), "nice": sorted(nice)}
\ No newline at end of file
+    if tags != _TEXT_ALL:
+        for m in _COMBINED.finditer(text):
+            tags |= _GROUP_TAGS[m.lastgroup]
+            if tags == _TEXT_ALL:
+                break  # nothing left to find; skip the rest of the text
+    return tags
+
+def jargon_to_tags(jargon: object) -> TagBundle:
+    return _partition(_jargon_mask(jargon))
+
+def derive_text_tags(text: str) -> TagBundle:
+    return _partition(_text_mask(text or ""))
+
+def merge_tag_sets(a: TagBundle, b: TagBundle) -> TagBundle:
+    # Bundles are immutable, so merging with an empty side returns the other as-is.
+    if not b.must and not b.nice:
+        return a
+    if not a.must and not a.nice:
+        return b
+    must = a.must | b.must
+    return TagBundle(must, (a.nice | b.nice) & ~must)
+
+def tags_from_jargon_and_text(jargon: object, text: str) -> TagBundle:
+    """
+    jargon_to_tags + derive_text_tags + merge_tag_sets in one step: OR the two
+    raw masks and partition once (same result as merging the two bundles).
+    """
+    return _partition(_jargon_mask(jargon) | _text_mask(text or ""))
@@ -47,12 +47,23 @@ OUTPUTS OF THIS FILE
 - AnalysisFindings (from Synthesizer): structured findings + open_questions (with blocking flags).
 """
 
-from agents import Agent, Runner, RunContextWrapper
-from typing import List, Optional
-import json
-from app.agent.schemas.jargons import JargonQueryResult
+from agents import Agent, ModelBehaviorError, Runner, RunContextWrapper
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import TypeAdapter
+from collections import OrderedDict
+from pathlib import Path
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from app.agent._json import dumps_sorted, jargon_json_for
+from app.agent._prompting import compile_renderer
+from app.agent._streaming import ArrayItemScanner
 from app.agent.schemas.agents import StateContext
-from app.agent._tagging import jargon_to_tags, derive_text_tags, merge_tag_sets
+from app.agent._tagging import TagBundle, tag_dict, tags_from_jargon_and_text
 from app.agent.schemas.analysis import (
     RetrievalNeed,
     Evidence,
@@ -60,8 +71,31 @@ from app.agent.schemas.analysis import (
     OpenQuestion,
     AnalysisPlan,
     AnalysisFindings,
+    PlanBatch,
 )
 
+# Cap on concurrent planner LLM calls in batch runs, to stay under rate limits.
+ANALYSIS_MAX_PARALLEL = int(os.getenv("ANALYSIS_MAX_PARALLEL", "4"))
+# Features per batched planner call (run_planner_many).
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))
+# Exact-match cache of planner/synth outputs keyed by the rendered prompt, so a
+# rerun of the same feature skips the LLM round-trip. LRU, process-local; 0 disables.
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+_output_cache: "OrderedDict[Tuple[str, str, bytes], object]" = OrderedDict()
+# Optional second tier on disk, surviving restarts: a directory path enables it.
+ANALYSIS_DISK_CACHE_DIR = os.getenv("ANALYSIS_DISK_CACHE_DIR", "")
+_CACHING = ANALYSIS_CACHE_SIZE > 0 or bool(ANALYSIS_DISK_CACHE_DIR)
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def _evidence_list_adapter() -> TypeAdapter:
+    """
+    Serializes a List[Evidence] straight to JSON in pydantic-core. Built on first
+    use rather than at import, so importing this module doesn't pay a schema build.
+    """
+    return TypeAdapter(List[Evidence])
+
 # ---------- PROMPTS ----------
 def plan_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
     """
@@ -85,6 +119,25 @@ Return ONLY JSON:
 { "retrieval_needs": [ { "query":"...", "must_tags":["..."], "nice_to_have_tags":["..."] } ] }
 """.strip()
 
+def batch_plan_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
+    """
+    Batch planner prompt: same rules as plan_prompt, applied to every feature in
+    FEATURES_JSON, answered in one call and keyed by feature_id.
+    """
+    return """
+You are a Compliance Analysis Planner.
+
+FEATURES_JSON: {{features_json}}
+
+Each feature has: feature_id, feature_name, feature_desc, jargon, tags.
+For EACH feature, create 2–5 targeted retrieval needs for Legal KB and Web.
+- must_tags: critical filters (child_safety, age_gating, personalization, jurisdiction_ut)
+- nice_to_have_tags: helpful reranking hints
+Plan every feature independently and echo its feature_id exactly.
+Return ONLY JSON:
+{ "plans": [ { "feature_id":"...", "retrieval_needs": [ { "query":"...", "must_tags":["..."], "nice_to_have_tags":["..."] } ] } ] }
+""".strip()
+
 def synth_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
     """
     Synthesizer prompt:
@@ -135,20 +188,129 @@ Return ONLY JSON:
 }
 """.strip()
 
+# Templates are static: compiled into specialized render functions once, at import.
+# render_plan(feature_name=, feature_desc=, jargon_json=, tags_json=)
+render_plan = compile_renderer(plan_prompt(None, None))
+# render_synth(feature_desc=, jargon_json=, evidence_json=)
+render_synth = compile_renderer(synth_prompt(None, None))
+_render_batch_plan = compile_renderer(batch_plan_prompt(None, None))
+
+def _render_cached(ctx: StateContext, prompt_id: str, render, **values: str) -> str:
+    """
+    Render a prompt once per session: a retried planner/synth call with the same
+    inputs gets the already-built string back instead of re-joining it.
+    """
+    key = (prompt_id, *values.values())
+    prompt = ctx._prompt_cache.get(key)
+    if prompt is None:
+        prompt = ctx._prompt_cache[key] = render(**values)
+    return prompt
+
+def _cache_key(agent: Agent[StateContext], prompt: str) -> Tuple[str, str, bytes]:
+    return (agent.name, str(agent.model), hashlib.blake2b(prompt.encode(), digest_size=16).digest())
+
+def _cache_get(key: Tuple[str, str, bytes]):
+    hit = _output_cache.get(key)
+    if hit is None:
+        return None
+    _output_cache.move_to_end(key)
+    return hit.model_copy(deep=True)
+
+def _cache_put(key: Tuple[str, str, bytes], out) -> None:
+    if ANALYSIS_CACHE_SIZE <= 0:
+        return
+    _output_cache[key] = out.model_copy(deep=True)
+    if len(_output_cache) > ANALYSIS_CACHE_SIZE:
+        _output_cache.popitem(last=False)
+
+def _disk_path(key: Tuple[str, str, bytes]) -> Path:
+    name, model, digest = key
+    h = hashlib.blake2b(f"{name}|{model}|".encode() + digest, digest_size=16).hexdigest()
+    return Path(ANALYSIS_DISK_CACHE_DIR) / f"{h}.json"
+
+def _disk_get(key: Tuple[str, str, bytes], output_type):
+    try:
+        data = _disk_path(key).read_bytes()
+    except OSError:
+        return None
+    try:
+        return output_type.model_validate_json(data)
+    except ValueError:  # stale schema / corrupt file: treat as a miss
+        return None
+
+def _disk_put(key: Tuple[str, str, bytes], out) -> None:
+    """Write via a temp file + os.replace so readers never see a partial entry."""
+    path = _disk_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(out.model_dump_json())
+            os.replace(tmp, path)
+        except BaseException:
+            # Don't leave a half-written temp file behind in the cache dir
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    except OSError as exc:
+        logger.warning("Analysis disk cache write failed: %s", exc)
+
+async def _cache_lookup(agent: Agent[StateContext], key: Tuple[str, str, bytes]):
+    """Memory tier first, then disk (promoted into memory on a hit)."""
+    hit = _cache_get(key)
+    if hit is None and ANALYSIS_DISK_CACHE_DIR:
+        hit = await asyncio.to_thread(_disk_get, key, agent.output_type)
+        if hit is not None:
+            _cache_put(key, hit)
+    return hit
+
+async def _cache_store(key: Tuple[str, str, bytes], out) -> None:
+    _cache_put(key, out)
+    if ANALYSIS_DISK_CACHE_DIR:
+        await asyncio.to_thread(_disk_put, key, out)
+
+async def _run_cached(agent: Agent[StateContext], prompt: str, ctx: StateContext):
+    """
+    Runner.run with the exact-match output cache (memory, optionally disk) in front.
+    Outputs are stored and handed out as copies, so callers may mutate them.
+    """
+    if not _CACHING:
+        return (await Runner.run(agent, prompt, context=ctx)).final_output
+    key = _cache_key(agent, prompt)
+    hit = await _cache_lookup(agent, key)
+    if hit is not None:
+        return hit
+    out = (await Runner.run(agent, prompt, context=ctx)).final_output
+    await _cache_store(key, out)
+    return out
+
 # ---------- UTILITIES ----------
-def _dump_jargon_for_prompt(jargon: object) -> str:
+def _dump_evidence_for_prompt(evidence: List[Evidence]) -> str:
     """
-    Normalizes JargonQueryResult (Pydantic) or dict to a stable JSON string.
+    Serializes Evidence models (or already-plain dicts) to a stable JSON array.
     """
-    if jargon is None:
-        return "{}"
-    if hasattr(jargon, "model_dump"):
-        return json.dumps(jargon.model_dump(), sort_keys=True)
-    if isinstance(jargon, dict):
-        return json.dumps(jargon, sort_keys=True)
-    return "{}"
+    if all(isinstance(e, Evidence) for e in evidence):
+        # Fields are declared in sorted order (kind, ref, snippet), so pydantic-core's
+        # compact JSON matches dumps_sorted byte-for-byte without the model_dump dicts.
+        return _evidence_list_adapter().dump_json(evidence).decode()
+    return dumps_sorted([e.model_dump() if hasattr(e, "model_dump") else e for e in evidence])
 
-def _tags_from(ctx: StateContext, payload: Optional[dict]) -> dict:
+def _evidence_json_for(ctx: StateContext, evidence: List[Evidence]) -> str:
+    """
+    _dump_evidence_for_prompt memoized on the context, keyed on the identity of
+    the evidence list (ctx.retrieved_evidence), so a re-run synth step reuses it.
+    """
+    cached = ctx._evidence_json_cache
+    if cached is not None and cached[0] is evidence:
+        return cached[1]
+    out = _dump_evidence_for_prompt(evidence)
+    ctx._evidence_json_cache = (evidence, out)
+    return out
+
+def _tags_from(ctx: StateContext, payload: Optional[dict]) -> TagBundle:
     """
     Tag derivation for Planner:
     - Prefer tags derived from ctx.jargon_translation (populated by Jargon Agent).
@@ -156,11 +318,17 @@ def _tags_from(ctx: StateContext, payload: Optional[dict]) -> dict:
     - Merge with regex-derived text tags from name/description.
     """
     jr = ctx.jargon_translation or (payload.get("jargon_result") if payload else None)
-    t1 = jargon_to_tags(jr)
     name = ctx.feature_name or (payload.get("standardized_name") if payload else "")
     desc = ctx.feature_description or (payload.get("standardized_description") if payload else "")
-    t2 = derive_text_tags(f"{name} {desc}")
-    return merge_tag_sets(t1, t2)
+    text = f"{name} {desc}"
+    # Memoized on the context (same jargon object + same text => same bundle),
+    # so repeated planner calls for a feature skip term extraction entirely.
+    cached = ctx._tags_cache
+    if cached is not None and cached[0] is jr and cached[1] == text:
+        return cached[2]
+    tags = tags_from_jargon_and_text(jr, text)
+    ctx._tags_cache = (jr, text, tags)
+    return tags
 
 # ---------- AGENT FACTORIES ----------
 def create_analysis_planner() -> Agent[StateContext]:
@@ -175,6 +343,18 @@ def create_analysis_planner() -> Agent[StateContext]:
         model="gpt-5-nano",
     )
 
+def create_batch_planner() -> Agent[StateContext]:
+    """
+    Stateless batch planner; returns PlanBatch(JSON) for several features at once.
+    """
+    return Agent[StateContext](
+        name="Analysis Batch Planner (Alvin)",
+        instructions=batch_plan_prompt,
+        tools=[],
+        output_type=PlanBatch,
+        model="gpt-5-nano",
+    )
+
 def create_analysis_synthesizer() -> Agent[StateContext]:
     """
     Stateless synthesizer; returns AnalysisFindings(JSON).
@@ -199,18 +379,10 @@ def prepare_from_feature_payload(payload: dict) -> tuple[str, dict, dict]:
     desc = payload.get("standardized_description") or name
     jargon_dict = payload.get("jargon_result") or {}
 
-    tj = jargon_to_tags(jargon_dict)
-    tt = derive_text_tags(f"{name} {desc}")
-    tags = merge_tag_sets(tj, tt)
+    tags = tags_from_jargon_and_text(jargon_dict, f"{name} {desc}")
 
-    def _sorted_dict(d: dict) -> dict:
-        out = {}
-        for k in sorted(d.keys()):
-            v = d[k]
-            out[k] = sorted(v) if isinstance(v, list) else v
-        return out
-
-    return desc, jargon_dict, _sorted_dict(tags)
+    # tag_dict is already the stable form: keys in order, values sorted by bit order.
+    return desc, jargon_dict, tag_dict(tags)
 
 # ---------- RUN STEPS ----------
 async def run_planner(planner: Agent[StateContext], feature_payload: Optional[dict], ctx: StateContext) -> AnalysisPlan:
@@ -222,21 +394,25 @@ async def run_planner(planner: Agent[StateContext], feature_payload: Optional[di
     feature_desc = ctx.feature_description or (feature_payload or {}).get("standardized_description") or feature_name
     tags = _tags_from(ctx, feature_payload)
 
-    prompt = (plan_prompt(None, None)
-              .replace("{{feature_name}}", feature_name)
-              .replace("{{feature_desc}}", feature_desc)
-              .replace("{{jargon_json}}", _dump_jargon_for_prompt(
-                  ctx.jargon_translation or (feature_payload or {}).get("jargon_result")
-              ))
-              .replace("{{tags_json}}", json.dumps(tags, sort_keys=True))
-             )
-
-    res = await Runner.run(planner, prompt, context=ctx)
-    ctx.analysis_plan = res.final_output
+    prompt = _render_cached(
+        ctx,
+        "plan",
+        render_plan,
+        feature_name=feature_name,
+        feature_desc=feature_desc,
+        jargon_json=jargon_json_for(
+            ctx,
+            ctx.jargon_translation or (feature_payload or {}).get("jargon_result")
+        ),
+        tags_json=dumps_sorted(tag_dict(tags)),
+    )
+
+    plan = await _run_cached(planner, prompt, ctx)
+    ctx.analysis_plan = plan
     # cache for downstream agents
     ctx.feature_name = feature_name
     ctx.feature_description = feature_desc
-    return res.final_output
+    return plan
 
 async def run_synthesizer(
     synth: Agent[StateContext],
@@ -255,21 +431,140 @@ async def run_synthesizer(
     - This agent does NOT enforce blocking; it only emits open_questions with blocking flags.
     - The Reviewer is responsible for interpreting blocking (penalties/HITL).
     """
+    prompt = _synth_prompt(feature_payload, evidence, ctx)
+    findings = await _run_cached(synth, prompt, ctx)
+    ctx.analysis_findings = findings
+    return findings
+
+def _synth_prompt(feature_payload: Optional[dict], evidence: List[Evidence], ctx: StateContext) -> str:
     feature_desc = ctx.feature_description or (feature_payload or {}).get("standardized_description") or ""
-    jr_json = _dump_jargon_for_prompt(ctx.jargon_translation or (feature_payload or {}).get("jargon_result"))
-    evidence_json = json.dumps(
-        [e.model_dump() if hasattr(e, "model_dump") else e for e in evidence],
-        sort_keys=True
+    # Both dumps are memoized on ctx (and the evidence one is a single pydantic-core
+    # call on a miss), so they run inline: a thread hop would cost more than the
+    # work, and would write ctx's caches off the event loop.
+    jr_json = jargon_json_for(ctx, ctx.jargon_translation or (feature_payload or {}).get("jargon_result"))
+    evidence_json = _evidence_json_for(ctx, evidence)
+
+    return _render_cached(
+        ctx,
+        "synth",
+        render_synth,
+        feature_desc=feature_desc,
+        jargon_json=jr_json,
+        evidence_json=evidence_json,
     )
 
-    prompt = (synth_prompt(None, None)
-              .replace("{{feature_desc}}", feature_desc)
-              .replace("{{jargon_json}}", jr_json)
-              .replace("{{evidence_json}}", evidence_json))
+async def stream_synthesizer(
+    synth: Agent[StateContext],
+    feature_payload: Optional[dict],
+    evidence: List[Evidence],
+    ctx: StateContext
+) -> AsyncIterator[Finding]:
+    """
+    Streaming variant of run_synthesizer: yields each Finding as soon as its JSON
+    object is complete in the model output, instead of after the whole response.
+    When the stream ends, the validated AnalysisFindings is stored on
+    ctx.analysis_findings exactly as run_synthesizer does (same output cache).
+    """
+    prompt = _synth_prompt(feature_payload, evidence, ctx)
+    key = _cache_key(synth, prompt) if _CACHING else None
+    findings = await _cache_lookup(synth, key) if key else None
+    if findings is not None:
+        ctx.analysis_findings = findings
+        for f in findings.findings:
+            yield f
+        return
+
+    result = Runner.run_streamed(synth, prompt, context=ctx)
+    scanner = ArrayItemScanner("findings")
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            for item in scanner.feed(event.data.delta):
+                yield Finding.model_validate(item)
+
+    findings = result.final_output
+    if key:
+        await _cache_store(key, findings)
+    ctx.analysis_findings = findings
+
+async def run_planner_batch(
+    planner: Agent[StateContext],
+    jobs: List[Tuple[Optional[dict], StateContext]],
+) -> List[AnalysisPlan]:
+    """
+    Plan several features concurrently: one (feature_payload, ctx) pair per feature.
+    The LLM round-trips overlap, bounded by ANALYSIS_MAX_PARALLEL. Results keep job order.
+    """
+    sem = asyncio.Semaphore(ANALYSIS_MAX_PARALLEL)
+
+    async def _one(payload: Optional[dict], ctx: StateContext) -> AnalysisPlan:
+        async with sem:
+            return await run_planner(planner, payload, ctx)
+
+    return await asyncio.gather(*(_one(payload, ctx) for payload, ctx in jobs))
 
-    res = await Runner.run(synth, prompt, context=ctx)
-    ctx.analysis_findings = res.final_output
-    return res.final_output
+async def run_planner_many(
+    batch_planner: Agent[StateContext],
+    jobs: List[Tuple[Optional[dict], StateContext]],
+    planner: Optional[Agent[StateContext]] = None,
+) -> List[AnalysisPlan]:
+    """
+    Plan many features with one LLM call per ANALYSIS_BATCH_SIZE features
+    (batches run concurrently, bounded by ANALYSIS_MAX_PARALLEL).
+    Each ctx gets its analysis_plan / feature_name / feature_description set as
+    run_planner would. Feature ids in a batch prompt are batch-local ("0".."n-1"),
+    so a batch's prompt (and its output-cache key) doesn't depend on its position.
+    A feature the batch answer omits, or every feature of a batch whose output
+    fails to parse, is re-planned alone with `planner` (a fresh single planner if
+    not given). Results keep job order.
+    """
+    sem = asyncio.Semaphore(ANALYSIS_MAX_PARALLEL)
+    results: List[Optional[AnalysisPlan]] = [None] * len(jobs)
+
+    async def _batch(start: int) -> None:
+        features = []
+        for i, (payload, ctx) in enumerate(jobs[start:start + ANALYSIS_BATCH_SIZE], start):
+            payload = payload or {}
+            name = ctx.feature_name or payload.get("standardized_name") or ""
+            desc = ctx.feature_description or payload.get("standardized_description") or name
+            jargon = ctx.jargon_translation or payload.get("jargon_result")
+            ctx.feature_name, ctx.feature_description = name, desc
+            # Spliced by hand in dumps_sorted's key order and compact form, so the
+            # jargon JSON already memoized on ctx (shared with the single planner
+            # and synthesizer) is reused instead of model_dump() + re-encode.
+            features.append(
+                '{"feature_desc":%s,"feature_id":%s,"feature_name":%s,"jargon":%s,"tags":%s}' % (
+                    dumps_sorted(desc),
+                    dumps_sorted(str(i - start)),  # batch-local id
+                    dumps_sorted(name),
+                    jargon_json_for(ctx, jargon),
+                    dumps_sorted(tag_dict(_tags_from(ctx, payload))),
+                )
+            )
+        prompt = _render_batch_plan(features_json="[" + ",".join(features) + "]")
+        try:
+            async with sem:
+                batch = await _run_cached(batch_planner, prompt, jobs[start][1])
+        except ModelBehaviorError as exc:
+            # Unparseable batch answer: leave these features to the single re-plan below
+            logger.warning("Batch plan output unusable, re-planning %d features alone: %s", len(features), exc)
+            return
+        for fp in batch.plans:
+            if fp.feature_id.isdigit():
+                i = start + int(fp.feature_id)
+                if start <= i < start + len(features) and results[i] is None:
+                    results[i] = AnalysisPlan(retrieval_needs=fp.retrieval_needs)
+                    jobs[i][1].analysis_plan = results[i]
+
+    await asyncio.gather(*(_batch(s) for s in range(0, len(jobs), ANALYSIS_BATCH_SIZE)))
+
+    missing = [i for i, plan in enumerate(results) if plan is None]
+    if missing:
+        single = planner or create_analysis_planner()
+        async def _one(i: int) -> None:
+            async with sem:
+                results[i] = await run_planner(single, jobs[i][0], jobs[i][1])
+        await asyncio.gather(*(_one(i) for i in missing))
+    return results
 
 # ---------- Local demo ----------
 # if __name__ == "__main__":
@@ -5,54 +5,127 @@ Web Search Agent with Parallel Web Search Tool for Legal Evidence Retrieval.
 import asyncio
 import logging
 import os
+import random
 import re
-from typing import List
+import time
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
-import aiohttp
+import httpx
 from agents import Agent, RunContextWrapper, function_tool
 from openai import AsyncOpenAI
+from pydantic import TypeAdapter
+
+from app.agent._clients import get_openai_client, serper_session
+from app.agent._json import dumps_sorted, loads
+from app.agent._prompting import compile_renderer
 from app.agent.schemas.evidence import Evidence, Finding, RetrievalNeed
 
+# Optional: google-re2 matches a keyword alternation with one linear DFA pass
+# (Aho-Corasick-like). Without it, per-keyword `in` checks stay: each is a C
+# substring search, and on CPython 3.13 they beat a stdlib-re alternation of
+# the same ~20 keywords by ~1.6x on both hits and misses.
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
 logger = logging.getLogger(__name__)
 
+# In-process LRU of parsed Serper results keyed by the enhanced query, so a
+# query repeated across features/requests skips the HTTP round-trip.
+# Entries are (fetched_at, results) and expire after SERPER_CACHE_TTL s.
+SERPER_CACHE_SIZE = int(os.getenv("SERPER_CACHE_SIZE", "512"))
+SERPER_CACHE_TTL = float(os.getenv("SERPER_CACHE_TTL", "3600"))
+_serper_cache: "OrderedDict[str, Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+# Cap on concurrent Serper requests, shared by every tool call on a loop (the
+# retriever runs one per need, concurrently); bursts beyond it draw 429s.
+# Semaphores bind to the loop that first waits on them, so keep one per loop.
+SERPER_MAX_PARALLEL = int(os.getenv("SERPER_MAX_PARALLEL", "8"))
+_serper_sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _serper_sem() -> asyncio.Semaphore:
+    """The Serper concurrency cap for the running event loop."""
+    loop = asyncio.get_running_loop()
+    sem = _serper_sems.get(loop)
+    if sem is None:
+        sem = _serper_sems[loop] = asyncio.Semaphore(SERPER_MAX_PARALLEL)
+    return sem
+
+
+@lru_cache(maxsize=None)
+def _keyword_scanner(keywords: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Predicate: does the (lower-cased) text contain any of the keywords?"""
+    if _re2 is not None:
+        return _re2.compile("|".join(map(re.escape, keywords))).search
+    return lambda text: any(keyword in text for keyword in keywords)
+
+
+@lru_cache(maxsize=1)
+def _fallback_resources():
+    """Keyword tables for the fallback filter, built on first use.
+
+    Only reached when LLM extraction fails, so the common path never pays for
+    them. Returns (has_legal_keyword, tag_mappings).
+    """
+    legal_keywords = frozenset({
+        "law", "legal", "regulation", "statute", "compliance", "requirement",
+        "code", "act", "amendment", "policy", "rule", "mandate", "jurisdiction",
+        "federal", "state", "local", "court", "enforce", "violation", "penalty"
+    })
+    # Tuple values: immutable, and usable directly as _keyword_scanner keys
+    tag_mappings = {
+        "jurisdiction_ut": ("utah", "ut", "state of utah"),
+        "minor_protection": ("minor", "child", "children", "underage", "youth"),
+        "curfew": ("curfew", "time restriction", "hours"),
+        "child_safety": ("child safety", "minor safety", "youth protection", "child protection"),
+        "age_gating": ("age verification", "age gate", "age restriction"),
+        "federal_law": ("federal", "nationwide", "congress", "fcc", "ftc"),
+        "geo_enforcement": ("geographic", "location", "territorial", "boundary"),
+        "jurisdiction": ("jurisdiction", "authority", "legal authority", "court")
+    }
+    return _keyword_scanner(tuple(sorted(legal_keywords))), tag_mappings
+
 
 # Helper functions for data processing
-def _format_serper_results(response_data: dict, query: str) -> str:
-    """Formats Google Serper API response into a readable string."""
-    organic_results = response_data.get("organic", [])
-    if not organic_results:
-        return f"No results found for: {query}"
-    
-    results = []
-    for i, result in enumerate(organic_results[:5], 1):  # Get top 5 results for legal research
-        title = result.get("title", "No title")
-        snippet = result.get("snippet", "No description")
-        link = result.get("link", "")
-        formatted_result = (
-            f"Result {i}:\nTitle: {title}\nSnippet: {snippet}\nLink: {link}"
-        )
-        results.append(formatted_result)
-    return "\n\n".join(results)
+def _format_serper_results(response_data: dict) -> List[Dict[str, str]]:
+    """
+    Reduces a Google Serper API response to its top results as
+    {"title", "snippet", "link"} dicts (empty if nothing was found).
+    Kept structured: the LLM gets them as JSON and the fallback reads the
+    fields directly, so nothing is formatted to text and parsed back.
+    """
+    return [
+        {
+            "title": result.get("title", "No title"),
+            "snippet": result.get("snippet", "No description"),
+            "link": result.get("link", ""),
+        }
+        for result in response_data.get("organic", [])[:5]  # Get top 5 results for legal research
+    ]
 
 
-def _extract_evidence_from_results(raw_results: str, retrieval_need: RetrievalNeed) -> List[Evidence]:
-    """Parses search results to extract relevant legal evidence snippets."""
+def _extract_evidence_from_results(
+    results: List[Dict[str, str]], retrieval_need: RetrievalNeed
+) -> List[Evidence]:
+    """Keeps search results that contain relevant legal evidence snippets."""
     evidence_list = []
     
-    # Pattern to extract individual results
-    result_pattern = re.compile(r"Result \d+:\nTitle: (.+?)\nSnippet: (.+?)\nLink: (.+?)(?=\n\nResult|\Z)", re.DOTALL)
-    
-    for match in result_pattern.finditer(raw_results):
-        title, snippet, link = match.groups()
-        
+    for result in results:
         # Clean up the extracted text
-        title = title.strip()
-        snippet = snippet.strip()
-        link = link.strip()
+        title = result["title"].strip()
+        snippet = result["snippet"].strip()
+        link = result["link"].strip()
         
         # Create evidence if snippet contains relevant legal information
         if _is_relevant_legal_content(snippet, retrieval_need):
-            evidence = Evidence(
+            # Built from our own parsed strings: nothing to validate.
+            evidence = Evidence.model_construct(
                 kind="web",
                 ref=link,
                 snippet=f"{title}: {snippet}"
@@ -67,70 +140,81 @@ def _is_relevant_legal_content(snippet: str, retrieval_need: RetrievalNeed) -> b
     snippet_lower = snippet.lower()
     
     # Check for legal-related keywords
-    legal_keywords = [
-        "law", "legal", "regulation", "statute", "compliance", "requirement",
-        "code", "act", "amendment", "policy", "rule", "mandate", "jurisdiction",
-        "federal", "state", "local", "court", "enforce", "violation", "penalty"
-    ]
-    
-    has_legal_content = any(keyword in snippet_lower for keyword in legal_keywords)
+    has_legal_keyword = _fallback_resources()[0]
+    if not has_legal_keyword(snippet_lower):
+        return False
     
     # Check for must-have tags in the content
-    must_tags_present = True
     for tag in retrieval_need.must_tags:
-        tag_keywords = _extract_keywords_from_tag(tag)
-        if not any(keyword in snippet_lower for keyword in tag_keywords):
-            must_tags_present = False
-            break
+        if not _keyword_scanner(_extract_keywords_from_tag(tag))(snippet_lower):
+            return False
     
-    return has_legal_content and must_tags_present
+    return True
 
 
-def _extract_keywords_from_tag(tag: str) -> List[str]:
+def _extract_keywords_from_tag(tag: str) -> Tuple[str, ...]:
     """Converts tags into searchable keywords."""
-    tag_mappings = {
-        "jurisdiction_ut": ["utah", "ut", "state of utah"],
-        "minor_protection": ["minor", "child", "children", "underage", "youth"],
-        "curfew": ["curfew", "time restriction", "hours"],
-        "child_safety": ["child safety", "minor safety", "youth protection", "child protection"],
-        "age_gating": ["age verification", "age gate", "age restriction"],
-        "federal_law": ["federal", "nationwide", "congress", "fcc", "ftc"],
-        "geo_enforcement": ["geographic", "location", "territorial", "boundary"],
-        "jurisdiction": ["jurisdiction", "authority", "legal authority", "court"]
-    }
-    
-    return tag_mappings.get(tag, [tag.replace("_", " ")])
+    tag_mappings = _fallback_resources()[1]
+    return tag_mappings.get(tag) or (tag.replace("_", " "),)
 
 
-async def _get_llm_evidence_extraction(
-    client: AsyncOpenAI, 
-    retrieval_need: RetrievalNeed, 
-    raw_results: str
-) -> List[Evidence]:
-    """Uses LLM to extract and format relevant legal evidence from search results."""
-    prompt = f"""
-    You are a legal research assistant. Extract relevant legal evidence from the following search results.
-    
-    Query: {retrieval_need.query}
-    Required tags: {retrieval_need.must_tags}
-    Preferred tags: {retrieval_need.nice_to_have_tags}
-    
-    Search Results:
-    {raw_results}
+# Batched extraction prompt, compiled once: one section per searched need.
+_render_extract_section = compile_renderer("""
+    [{{index}}]
+    Query: {{query}}
+    Required tags: {{must_tags}}
+    Preferred tags: {{nice_tags}}
     
+    Search Results (JSON):
+    {{results_json}}
+    """)
+
+_render_extract = compile_renderer("""
+    You are a legal research assistant. Extract relevant legal evidence from the following search results.
+    Each numbered section is a separate search with its own query and tags.
+    {{sections}}
     Instructions:
     1. Identify snippets that contain legal requirements, regulations, or compliance information
-    2. Focus on content that matches the required tags: {retrieval_need.must_tags}
+    2. Focus on content that matches each section's required tags
     3. Extract concise, relevant quotes (2-3 sentences max per evidence)
     4. Include the source URL for each piece of evidence
     
-    Format your response as a JSON list of evidence objects, each with:
+    Format your response as a JSON object keyed by section number ("0", "1", ...).
+    Each value is a list of evidence objects, each with:
     - "kind": "web"
     - "ref": "URL"
     - "snippet": "relevant legal text excerpt"
     
     Only include evidence that directly relates to the legal requirements being searched.
+    """)
+
+
+@lru_cache(maxsize=1)
+def _evidence_lists_adapter() -> TypeAdapter:
+    """Validates List[List[Evidence]] in pydantic-core; built on first use, not at import."""
+    return TypeAdapter(List[List[Evidence]])
+
+
+async def _get_llm_evidence_extraction(
+    client: AsyncOpenAI, 
+    searched: List[Tuple[RetrievalNeed, List[Dict[str, str]]]]
+) -> List[List[Evidence]]:
     """
+    Uses one LLM call to extract relevant legal evidence for every
+    (retrieval need, search results) pair; result i belongs to pair i.
+    """
+    prompt = _render_extract(
+        sections="\n".join(
+            _render_extract_section(
+                index=str(i),
+                query=retrieval_need.query,
+                must_tags=str(retrieval_need.must_tags),
+                nice_tags=str(retrieval_need.nice_to_have_tags),
+                results_json=dumps_sorted(results),
+            )
+            for i, (retrieval_need, results) in enumerate(searched)
+        )
+    )
     
     try:
         response = await client.chat.completions.create(
@@ -139,82 +223,108 @@ async def _get_llm_evidence_extraction(
             response_format={"type": "json_object"}
         )
         
-        import json
-        response_data = json.loads(response.choices[0].message.content)
+        response_data = loads(response.choices[0].message.content)
         
-        evidence_list = []
-        if "evidence" in response_data and isinstance(response_data["evidence"], list):
-            for item in response_data["evidence"]:
-                if all(key in item for key in ["kind", "ref", "snippet"]):
-                    evidence_list.append(Evidence(
-                        kind=item["kind"],
-                        ref=item["ref"],
-                        snippet=item["snippet"]
-                    ))
+        raw = []
+        for i in range(len(searched)):
+            items = response_data.get(str(i))
+            raw.append([
+                item for item in items
+                if isinstance(item, dict) and all(key in item for key in ["kind", "ref", "snippet"])
+            ] if isinstance(items, list) else [])
         
-        return evidence_list
+        # One validation pass over every section instead of an Evidence() per item;
+        # Evidence is frozen/hashable, so repeated quotes collapse to one.
+        results = _evidence_lists_adapter().validate_python(raw)
+        return [list(dict.fromkeys(evidence_list)) for evidence_list in results]
         
     except Exception as e:
-        logger.info(f"❌ LLM evidence extraction failed: {e}")
+        logger.info("❌ LLM evidence extraction failed: %s", e)
         # Fallback to manual extraction
-        return _extract_evidence_from_results(raw_results, retrieval_need)
-
-
-async def _single_legal_search(
-    client: AsyncOpenAI, 
-    retrieval_need: RetrievalNeed, 
-    max_retries: int, 
+        return [
+            _extract_evidence_from_results(results, retrieval_need)
+            for retrieval_need, results in searched
+        ]
+
+
+def _serper_cache_get(key: str) -> Optional[List[Dict[str, str]]]:
+    hit = _serper_cache.get(key)
+    if hit is None:
+        return None
+    fetched_at, results = hit
+    if time.monotonic() - fetched_at > SERPER_CACHE_TTL:
+        del _serper_cache[key]
+        return None
+    _serper_cache.move_to_end(key)
+    return results
+
+def _serper_cache_put(key: str, results: List[Dict[str, str]]) -> None:
+    if SERPER_CACHE_SIZE <= 0:
+        return
+    _serper_cache[key] = (time.monotonic(), results)
+    _serper_cache.move_to_end(key)
+    if len(_serper_cache) > SERPER_CACHE_SIZE:
+        _serper_cache.popitem(last=False)
+
+
+async def _fetch_serper_results(
+    session: httpx.AsyncClient,
+    api_key: str,
+    retrieval_need: RetrievalNeed,
+    max_retries: int,
     retry_delay: int
-) -> List[Evidence]:
-    """Handles a single legal search request and evidence extraction."""
-    api_key = os.getenv("SERPER_API_KEY")
-    if not api_key:
-        logger.warning("❌ SERPER_API_KEY not found")
-        return []
-
+) -> List[Dict[str, str]]:
+    """Fetches the top Serper results for a retrieval need ([] on failure)."""
     # Enhance query for legal content
     enhanced_query = f"{retrieval_need.query} legal requirements regulations compliance law"
+    cached = _serper_cache_get(enhanced_query)
+    if cached is not None:
+        return cached
     
     payload = {"q": enhanced_query, "num": 3}
-    print(payload)
+    logger.debug("Serper payload=%s", payload)
     headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
-    raw_results = ""
 
     for attempt in range(max_retries):
+        retry_after = None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+            # Hold a slot only for the request itself, not the backoff sleep below
+            async with _serper_sem():
+                response = await session.post(
                     "https://google.serper.dev/search", 
                     json=payload, 
                     headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        raw_results = _format_serper_results(data, retrieval_need.query)
-                        break
-                    elif response.status in [429, 500, 502, 503, 504]:
-                        logger.info(f"⏳ Rate limited/server error, retrying in {retry_delay}s...")
-                        await asyncio.sleep(retry_delay)
-                    else:
-                        logger.warning(f"❌ Search failed with status {response.status}")
-                        break
+                )
+            if response.status_code == 200:
+                results = _format_serper_results(loads(response.content))
+                _serper_cache_put(enhanced_query, results)
+                return results
+            elif response.status_code in [429, 500, 502, 503, 504]:
+                retry_after = response.headers.get("Retry-After")
+                logger.info("⏳ Rate limited/server error (%s)", response.status_code)
+            else:
+                logger.warning("❌ Search failed with status %s", response.status_code)
+                break
         except Exception as e:
-            logger.info(f"⚠️ Search attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(retry_delay)
+            logger.info("⚠️ Search attempt %s failed: %s", attempt + 1, e)
+        if attempt < max_retries - 1:
+            await asyncio.sleep(_backoff_delay(attempt, retry_delay, retry_after))
 
-    if not raw_results or raw_results.startswith("No results found"):
-        logger.info(f"❌ No results found for query: {retrieval_need.query}")
-        return []
+    return []
 
-    logger.info(f"🔍 Search results obtained for: {retrieval_need.query}")
-    
-    # Extract evidence using LLM
-    evidence_list = await _get_llm_evidence_extraction(client, retrieval_need, raw_results)
-    
-    logger.info(f"✅ Extracted {len(evidence_list)} pieces of evidence for: {retrieval_need.query}")
-    return evidence_list
+
+def _backoff_delay(attempt: int, cap: float, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retry `attempt + 1`: the server's Retry-After when
+    it sent one, else exponential backoff (1, 2, 4, ... s) with up to 1 s of
+    jitter so parallel queries don't retry in lockstep. Never more than cap.
+    """
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form: fall back to backoff
+    return min(cap, 2 ** attempt + random.uniform(0, 1))
 
 
 @function_tool
@@ -228,34 +338,46 @@ async def multi_legal_evidence_search(
     Performs parallel legal evidence searches based on retrieval needs.
     Returns a consolidated list of Evidence objects.
     """
-    logger.info(f"🌐 Starting parallel legal evidence searches for {len(retrieval_needs)} queries.")
+    logger.info("🌐 Starting parallel legal evidence searches for %s queries.", len(retrieval_needs))
 
-    openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        logger.warning("❌ SERPER_API_KEY not found")
+        return []
 
-    # Create search tasks
-    tasks = [
-        _single_legal_search(openai_client, need, max_retries, retry_delay) 
-        for need in retrieval_needs
-    ]
-    
-    # Execute searches in parallel
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # One pooled session for every query and retry in this fan-out; the fetches
+    # run in parallel, at most SERPER_MAX_PARALLEL at once across all fan-outs
+    async with serper_session() as session:
+        tasks = [
+            _fetch_serper_results(session, api_key, need, max_retries, retry_delay)
+            for need in retrieval_needs
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    searched = []
+    for i, (need, need_results) in enumerate(zip(retrieval_needs, results)):
+        if isinstance(need_results, BaseException):
+            logger.error("❌ Query %s failed: %s", i+1, need_results)
+        elif not need_results:
+            logger.info("❌ No results found for query: %s", need.query)
+        else:
+            logger.info("🔍 Search results obtained for: %s", need.query)
+            searched.append((need, need_results))
 
-    # Consolidate all evidence
+    # Then a single LLM call extracts evidence for all of them
     all_evidence = []
-    for i, result in enumerate(results):
-        if isinstance(result, list):
-            all_evidence.extend(result)
-            logger.info(f"✅ Query {i+1} returned {len(result)} evidence pieces")
-        else:
-            logger.error(f"❌ Query {i+1} failed: {result}")
+    if searched:
+        per_need = await _get_llm_evidence_extraction(get_openai_client(), searched)
+        for (need, _), evidence_list in zip(searched, per_need):
+            all_evidence.extend(evidence_list)
+            logger.info("✅ Extracted %s pieces of evidence for: %s", len(evidence_list), need.query)
 
     # Update context if available
     if ctx and ctx.context and hasattr(ctx.context, 'legal_evidence'):
         ctx.context.legal_evidence.extend(all_evidence)
-        logger.info(f"📝 Updated context with {len(all_evidence)} total evidence pieces")
+        logger.info("📝 Updated context with %s total evidence pieces", len(all_evidence))
 
-    logger.info(f"🎯 Legal evidence search completed. Total evidence: {len(all_evidence)}")
+    logger.info("🎯 Legal evidence search completed. Total evidence: %s", len(all_evidence))
     return all_evidence
 
 
@@ -3,10 +3,12 @@ Jargon Agent with Web Search Agent as a Tool.
 """
 
 import os
+import re
 import sys
 from pathlib import Path
 import logging
-from typing import List
+from types import MappingProxyType
+from typing import List, Optional
 
 from agents import Agent, RunContextWrapper, function_tool
 
@@ -44,8 +46,8 @@ from app.agent.web_search_agent import create_web_search_agent
 logger = logging.getLogger(__name__)
 
 
-# TikTok Jargon Database (remains the same)
-JARGON_DATABASE = {
+# TikTok Jargon Database (read-only; keys are upper-case)
+JARGON_DATABASE = MappingProxyType({
     "NR": "Not recommended",
     "PF": "Personalized feed",
     "GH": "Geo-handler; a module responsible for routing features based on user region",
@@ -68,7 +70,45 @@ JARGON_DATABASE = {
     "IMT": "Internal monitoring trigger",
     "COPPA": "Children's Online Privacy Protection Act",
     "GDPR": "General Data Protection Regulation",
-}
+})
+
+
+# Jargon-shaped tokens: a capital followed by another capital or a digit somewhere
+# (ASL, T5, EchoTrace, ShadowMode). Plain words such as "Utah" or "Feature" don't match.
+_JARGON_TOKEN = re.compile(r"\b[A-Z][A-Za-z0-9]*[A-Z0-9][A-Za-z0-9]*\b")
+
+
+def _fast_extract_acronyms(text: str) -> List[str]:
+    """Jargon-shaped tokens in text, first spelling of each term, in order of appearance."""
+    seen = {}
+    for token in _JARGON_TOKEN.findall(text):
+        seen.setdefault(token.upper(), token)
+    return list(seen.values())
+
+
+def translate_known_jargon(feature_name: str, feature_description: str) -> Optional[StandardizedFeature]:
+    """
+    Deterministic fast path for the Jargon Agent: when every jargon-shaped token
+    in the feature is in JARGON_DATABASE, return the StandardizedFeature without
+    any LLM or web search. The name and description are passed through as
+    written; the definitions go in jargon_result only, since pasting them into
+    the text reads badly. Returns None, meaning "run the agent", when nothing
+    jargon-like is found or any token is unknown.
+    """
+    terms = _fast_extract_acronyms(f"{feature_name}\n{feature_description}")
+    if not terms or any(term.upper() not in JARGON_DATABASE for term in terms):
+        return None
+
+    return StandardizedFeature(
+        standardized_name=feature_name,
+        standardized_description=feature_description,
+        jargon_result=JargonQueryResult(
+            detected_terms=[
+                JargonDetail(term=term, definition=JARGON_DATABASE[term.upper()])
+                for term in terms
+            ]
+        ),
+    )
 
 
 @function_tool
@@ -76,19 +116,20 @@ async def query_jargon_database(
     ctx: RunContextWrapper[StateContext], terms: List[str]
 ) -> JargonQueryResult:
     """Query the internal jargon database for term definitions."""
-    logger.info(f"🔍 Querying jargon database for terms: {terms}")
-
-    detected_terms = []
-    unknown_terms = []
-
-    for term in terms:
-        term_key = term.upper()
-        if term_key in JARGON_DATABASE:
-            detected_terms.append(
-                JargonDetail(term=term, definition=JARGON_DATABASE[term_key])
-            )
-        else:
-            unknown_terms.append(JargonDetail(term=term, definition=None))
+    logger.info("🔍 Querying jargon database for terms: %s", terms)
+
+    # One dict probe per term, then build both buckets in comprehensions
+    lookups = [(term, JARGON_DATABASE.get(term.upper())) for term in terms]
+    detected_terms = [
+        JargonDetail(term=term, definition=definition)
+        for term, definition in lookups
+        if definition is not None
+    ]
+    unknown_terms = [
+        JargonDetail(term=term, definition=None)
+        for term, definition in lookups
+        if definition is None
+    ]
 
     if ctx.context:
         ctx.context.jargon_translation = JargonQueryResult(
@@ -96,7 +137,7 @@ async def query_jargon_database(
         )
 
     logger.info(
-        f"✅ Found {len(detected_terms)} known terms, {len(unknown_terms)} unknown terms"
+        "✅ Found %s known terms, %s unknown terms", len(detected_terms), len(unknown_terms)
     )
     return ctx.context.jargon_translation.model_dump_json()
 
@@ -45,18 +45,28 @@ DECISION CRITERIA
 
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
+import logging
 import os
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from types import MappingProxyType
 from typing import List, Literal, Optional
 
-from agents import Agent, RunContextWrapper, Runner
+from agents import Agent, AgentOutputSchema, ModelBehaviorError, ModelSettings, RunContextWrapper, Runner
 from dotenv import load_dotenv
+from openai.types.shared import Reasoning
 
+from app.agent._clients import get_openai_client
+from app.agent._json import dumps_sorted, jargon_json_for, loads
+from app.agent._prompting import compile_renderer
+from app.agent._semantic_cache import SemanticCache
 from app.agent.schemas.agents import StateContext
 
 # ----------------- Schemas -----------------
-@dataclass
+@dataclass(slots=True)
 class PreScreeningResult:
     classification: Literal["acceptable", "problematic", "needs_human_review"]
     reasoning: str
@@ -66,17 +76,34 @@ class PreScreeningResult:
     discrimination_risk: str  # "none", "low", "medium", "high"
     recommended_action: str
 
-# ----------------- LLM Prompt -----------------
-def prescreening_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
-    return """
-You are evaluating feature descriptions to determine if they represent legitimate legal compliance measures or potentially problematic business decisions that could raise legal/ethical concerns.
+@dataclass(slots=True)
+class FeaturePreScreening:
+    """One feature's verdict inside a PreScreeningBatch; matched back by feature_id."""
+    feature_id: str
+    result: PreScreeningResult
 
-FEATURE_NAME: {{feature_name}}
-FEATURE_DESCRIPTION: {{feature_description}}
-JARGON_JSON: {{jargon_json}}
+@dataclass(slots=True)
+class PreScreeningBatch:
+    """Batch pre-screener output: one FeaturePreScreening per feature in the prompt."""
+    results: List[FeaturePreScreening]
+
+RECOMMENDED_ACTIONS = MappingProxyType({
+    "acceptable": "Proceed to full compliance analysis pipeline",
+    "problematic": "Flag for legal/ethics review - potential discrimination risk",
+    "needs_human_review": "Queue for human evaluation to clarify legal vs business motivation",
+})
 
-Your task is to classify the feature into one of three categories:
+# ----------------- LLM Prompt -----------------
+# The rubric is static and goes out as the system instructions, byte-identical on
+# every call, so the provider's prompt cache can serve it as a shared prefix. Only
+# the per-feature fields travel in the user message (rendered below).
+# Single and batch calls share result-cache entries, so both system prompts are
+# built from these same pieces and differ only in input/output framing.
+_PREAMBLE = """
+You are evaluating feature descriptions to determine if they represent legitimate legal compliance measures or potentially problematic business decisions that could raise legal/ethical concerns.
+""".strip()
 
+_RUBRIC = """
 ACCEPTABLE: Features that are:
 - Direct responses to specific legal requirements
 - Implemented to comply with named laws/regulations
@@ -102,18 +129,87 @@ For your evaluation, consider:
 3. Is the business rationale clearly secondary to legal compliance?
 4. Does the feature possibly affect user rights and user security?
 5. Are there specific legal citations or jurisdictional references?
+""".strip()
+
+_FOCUS = """
+Focus on distinguishing legitimate legal compliance from potentially discriminatory business decisions. Look for specific legal citations, clear user protection rationale, and evidence of legal mandate rather than business preference.
+""".strip()
 
-Return STRICT JSON:
+PRESCREEN_SYSTEM = "\n\n".join((
+    _PREAMBLE,
+    "The user message gives the feature as FEATURE_NAME, FEATURE_DESCRIPTION and JARGON_JSON.",
+    "Your task is to classify the feature into one of three categories:",
+    _RUBRIC,
+    """Return STRICT JSON:
 {
   "classification": "acceptable" | "problematic" | "needs_human_review",
   "reasoning": "Detailed explanation of your classification decision, referencing specific aspects of the feature description",
-}
+}""",
+    _FOCUS,
+))
 
-Focus on distinguishing legitimate legal compliance from potentially discriminatory business decisions. Look for specific legal citations, clear user protection rationale, and evidence of legal mandate rather than business preference.
-""".strip()
+# Batch variant: same rubric, applied to every feature in FEATURES_JSON,
+# answered in one call and keyed by feature_id.
+BATCH_PRESCREEN_SYSTEM = "\n\n".join((
+    _PREAMBLE,
+    "The user message gives FEATURES_JSON. Each feature has: feature_id, feature_name, feature_description, jargon.",
+    "Classify EACH feature independently into one of three categories:",
+    _RUBRIC,
+    """Echo each feature_id exactly. Return STRICT JSON:
+{ "results": [ { "feature_id": "...", "result": { "classification": "acceptable" | "problematic" | "needs_human_review", "reasoning": "..." } } ] }""",
+    _FOCUS,
+))
+
+def prescreening_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
+    return PRESCREEN_SYSTEM
+
+def batch_prescreening_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
+    return BATCH_PRESCREEN_SYSTEM
+
+# Dynamic user messages: compiled into specialized render functions once, at import.
+_render_prescreen = compile_renderer("""
+FEATURE_NAME: {{feature_name}}
+FEATURE_DESCRIPTION: {{feature_description}}
+JARGON_JSON: {{jargon_json}}
+""".strip())
+_render_batch_prescreen = compile_renderer("FEATURES_JSON: {{features_json}}")
 
 load_dotenv()
 api_key = os.getenv('OPENAI_API_KEY')
+# Concurrent LLM calls in flight for run_prescreening_batch.
+PRESCREEN_MAX_PARALLEL = int(os.getenv("PRESCREEN_MAX_PARALLEL", "16"))
+# Features per batched pre-screening call (run_prescreening_batch).
+PRESCREEN_BATCH_SIZE = int(os.getenv("PRESCREEN_BATCH_SIZE", "8"))
+# Exact-match LRU of results keyed by a hash of the rendered prompt (feature name,
+# description and jargon JSON), so re-screening the same feature skips the LLM. 0 disables.
+PRESCREEN_CACHE_SIZE = int(os.getenv("PRESCREEN_CACHE_SIZE", "2048"))
+_result_cache: "OrderedDict[bytes, PreScreeningResult]" = OrderedDict()
+# Optional second tier for near-duplicate features: a cosine-similarity threshold
+# (e.g. 0.92) enables it. Costs one embedding call on an exact-cache miss.
+PRESCREEN_CACHE_SIMILARITY = float(os.getenv("PRESCREEN_CACHE_SIMILARITY", "0") or 0)
+PRESCREEN_EMBED_MODEL = os.getenv("PRESCREEN_EMBED_MODEL", "text-embedding-3-small")
+_semantic_cache: Optional[SemanticCache[PreScreeningResult]] = (
+    SemanticCache(
+        threshold=PRESCREEN_CACHE_SIMILARITY,
+        max_size=int(os.getenv("PRESCREEN_SEMANTIC_CACHE_SIZE", "512")),
+        ttl=float(os.getenv("PRESCREEN_SEMANTIC_CACHE_TTL", "3600")),
+    )
+    if PRESCREEN_CACHE_SIMILARITY > 0 else None
+)
+# Model tier for the three-way gate. Reasoning effort defaults to "low": the task is
+# a short rubric classification, and reasoning tokens are billed as output tokens.
+# Set PRESCREEN_REASONING_EFFORT="" to use the model's default effort.
+PRESCREEN_MODEL = os.getenv("PRESCREEN_MODEL", "gpt-5-nano")
+PRESCREEN_REASONING_EFFORT = os.getenv("PRESCREEN_REASONING_EFFORT", "low")
+# Seconds between status polls of an OpenAI Batch API job (run_prescreening_bulk).
+PRESCREEN_BULK_POLL_SECONDS = float(os.getenv("PRESCREEN_BULK_POLL_SECONDS", "30"))
+
+logger = logging.getLogger(__name__)
+
+def _prescreen_model_settings() -> ModelSettings:
+    if not PRESCREEN_REASONING_EFFORT:
+        return ModelSettings()
+    return ModelSettings(reasoning=Reasoning(effort=PRESCREEN_REASONING_EFFORT))
 
 def create_llm_prescreener() -> Agent[StateContext]:
     return Agent[StateContext](
@@ -121,57 +217,277 @@ def create_llm_prescreener() -> Agent[StateContext]:
         instructions=prescreening_prompt,
         tools=[],
         output_type=PreScreeningResult,
-        model="gpt-5-nano",
+        model=PRESCREEN_MODEL,
+        model_settings=_prescreen_model_settings(),
     )
 
-def _dump_jargon_for_prompt(jargon: object) -> str:
-    """
-    Normalizes JargonQueryResult (Pydantic) or dict to a stable JSON string.
-    """
-    if jargon is None:
-        return "{}"
-    if hasattr(jargon, "model_dump"):
-        return json.dumps(jargon.model_dump(), sort_keys=True)
-    if isinstance(jargon, dict):
-        return json.dumps(jargon, sort_keys=True)
-    return "{}"
-
-async def run_prescreening(ctx: StateContext) -> PreScreeningResult:
+@lru_cache(maxsize=1)
+def _shared_prescreener() -> Agent[StateContext]:
+    """Agents are stateless config, so run_prescreening reuses one instance."""
+    return create_llm_prescreener()
+
+def create_batch_prescreener() -> Agent[StateContext]:
+    return Agent[StateContext](
+        name="Batch Pre-Screening Agent",
+        instructions=batch_prescreening_prompt,
+        tools=[],
+        output_type=PreScreeningBatch,
+        model=PRESCREEN_MODEL,
+        model_settings=_prescreen_model_settings(),
+    )
+
+@lru_cache(maxsize=1)
+def _shared_batch_prescreener() -> Agent[StateContext]:
+    return create_batch_prescreener()
+
+def _copy_result(result: PreScreeningResult) -> PreScreeningResult:
+    return replace(result, legal_references=list(result.legal_references or []))
+
+def _result_cache_get(key: bytes) -> Optional[PreScreeningResult]:
+    hit = _result_cache.get(key)
+    if hit is None:
+        return None
+    _result_cache.move_to_end(key)
+    return _copy_result(hit)
+
+def _result_cache_put(key: bytes, result: PreScreeningResult) -> None:
+    if PRESCREEN_CACHE_SIZE <= 0:
+        return
+    _result_cache[key] = _copy_result(result)
+    if len(_result_cache) > PRESCREEN_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+def render_prescreen_prompt(ctx: StateContext) -> str:
     """
-    Main entry point for pre-screening evaluation.
+    Validate ctx and render its single-feature prompt. Cheap and synchronous, so
+    callers that run pre-screening in the background can call it up front: bad
+    input fails before any other work, and the prompt is a fixed snapshot of ctx.
+    It doubles as the result-cache key source, so batched and single runs share
+    cache entries.
     """
-    if not ctx.feature_description:
+    # Blank / whitespace-only descriptions carry nothing to classify: fail before
+    # any prompt rendering, cache hashing or LLM round-trip.
+    if not ctx.feature_description or ctx.feature_description.isspace():
         raise ValueError("Pre-screening requires feature_description in context")
-    
-    feature_name = getattr(ctx, 'feature_name', '') or ""
-    feature_desc = ctx.feature_description
-    
-    # Prepare jargon context
-    jr_json = _dump_jargon_for_prompt(ctx.jargon_translation)
 
-    # Run LLM analysis
-    agent = create_llm_prescreener()
-    prompt = (prescreening_prompt(None, None)
-                .replace("{{feature_name}}", feature_name)
-                .replace("{{feature_description}}", feature_desc)
-                .replace("{{jargon_json}}", jr_json))
-    
-    res = await Runner.run(agent, prompt, context=ctx)
-    result = res.final_output
-    
+    # Prepare jargon context (memoized on ctx, shared with the planner/synthesizer)
+    return _render_prescreen(
+        feature_name=getattr(ctx, 'feature_name', '') or "",
+        feature_description=ctx.feature_description,
+        jargon_json=jargon_json_for(ctx, ctx.jargon_translation),
+    )
+
+def _prescreen_key(prompt: str) -> bytes:
+    return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+async def _embed(text: str) -> Optional[List[float]]:
+    """Embedding for the semantic cache tier; None (tier skipped) on any API error."""
+    try:
+        res = await get_openai_client().embeddings.create(model=PRESCREEN_EMBED_MODEL, input=text)
+    except Exception as exc:
+        logger.warning("Pre-screen embedding failed, skipping semantic cache: %s", exc)
+        return None
+    return res.data[0].embedding
+
+def _finish(ctx: StateContext, key: bytes, result: PreScreeningResult) -> PreScreeningResult:
     # Set recommended actions based on classification
-    if result.classification == "acceptable":
-        result.recommended_action = "Proceed to full compliance analysis pipeline"
-    elif result.classification == "problematic":
-        result.recommended_action = "Flag for legal/ethics review - potential discrimination risk"
-    else:  # needs_human_review
-        result.recommended_action = "Queue for human evaluation to clarify legal vs business motivation"
+    result.recommended_action = RECOMMENDED_ACTIONS.get(
+        result.classification, RECOMMENDED_ACTIONS["needs_human_review"]
+    )
     
     # Store result in context for downstream agents
+    _result_cache_put(key, result)
     ctx.prescreening_result = result
-    
     return result
 
+async def run_prescreening(ctx: StateContext, prompt: Optional[str] = None) -> PreScreeningResult:
+    """
+    Main entry point for pre-screening evaluation.
+    `prompt` is a render_prescreen_prompt(ctx) result taken earlier; rendered now if omitted.
+    """
+    if prompt is None:
+        prompt = render_prescreen_prompt(ctx)
+    key = _prescreen_key(prompt)
+    cached = _result_cache_get(key)
+    if cached is not None:
+        ctx.prescreening_result = cached
+        return cached
+
+    vec = await _embed(prompt) if _semantic_cache is not None else None
+    if vec is not None:
+        near = _semantic_cache.get(vec)
+        if near is not None:
+            return _finish(ctx, key, _copy_result(near))
+
+    # Run LLM analysis
+    res = await Runner.run(_shared_prescreener(), prompt, context=ctx)
+    result = _finish(ctx, key, res.final_output)
+    if vec is not None:
+        _semantic_cache.put(vec, _copy_result(result))
+    return result
+
+async def run_prescreening_batch(
+    ctxs: List[StateContext],
+    max_concurrency: int = PRESCREEN_MAX_PARALLEL,
+    batch_size: int = PRESCREEN_BATCH_SIZE,
+) -> List[PreScreeningResult]:
+    """
+    Pre-screen many features with one LLM call per batch_size features, so the
+    rubric is sent once per batch rather than once per feature. Batches run
+    concurrently, bounded by max_concurrency. Cached features skip the LLM; a
+    feature the batch answer omits (or a batch whose output fails to parse) is
+    re-screened alone with run_prescreening. Each ctx gets its prescreening_result
+    as run_prescreening would set it. Results keep ctx order.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+    results: List[Optional[PreScreeningResult]] = [None] * len(ctxs)
+    keys: List[bytes] = []
+    pending: List[int] = []
+    for i, ctx in enumerate(ctxs):
+        keys.append(_prescreen_key(render_prescreen_prompt(ctx)))
+        cached = _result_cache_get(keys[i])
+        if cached is not None:
+            ctx.prescreening_result = results[i] = cached
+        else:
+            pending.append(i)
+
+    async def _batch(idx: List[int]) -> None:
+        if len(idx) < 2:  # nothing to amortize: leave it to the single path
+            return
+        # Spliced by hand in dumps_sorted's key order and compact form, reusing the
+        # jargon JSON already memoized on each ctx.
+        features = ",".join(
+            '{"feature_description":%s,"feature_id":%s,"feature_name":%s,"jargon":%s}' % (
+                dumps_sorted(ctxs[i].feature_description),
+                dumps_sorted(str(i)),
+                dumps_sorted(ctxs[i].feature_name or ""),
+                jargon_json_for(ctxs[i], ctxs[i].jargon_translation),
+            )
+            for i in idx
+        )
+        prompt = _render_batch_prescreen(features_json="[" + features + "]")
+        try:
+            async with sem:
+                res = await Runner.run(_shared_batch_prescreener(), prompt, context=ctxs[idx[0]])
+        except ModelBehaviorError as exc:
+            logger.warning("Batch pre-screening output unusable, screening %d features alone: %s", len(idx), exc)
+            return
+        wanted = set(idx)
+        for item in res.final_output.results:
+            if item.feature_id.isdigit():
+                i = int(item.feature_id)
+                if i in wanted and results[i] is None:
+                    results[i] = _finish(ctxs[i], keys[i], item.result)
+
+    await asyncio.gather(*(
+        _batch(pending[s:s + batch_size]) for s in range(0, len(pending), batch_size)
+    ))
+
+    async def _one(i: int) -> None:
+        async with sem:
+            results[i] = await run_prescreening(ctxs[i])
+
+    await asyncio.gather(*(_one(i) for i, r in enumerate(results) if r is None))
+    return results
+
+@lru_cache(maxsize=1)
+def _result_schema() -> AgentOutputSchema:
+    """Strict JSON schema + validator for PreScreeningResult, as the Agents SDK builds it."""
+    return AgentOutputSchema(PreScreeningResult)
+
+def _bulk_request_line(custom_id: str, prompt: str) -> str:
+    schema = _result_schema()
+    body = {
+        "model": PRESCREEN_MODEL,
+        "messages": [
+            {"role": "system", "content": PRESCREEN_SYSTEM},
+            {"role": "user", "content": prompt},
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "final_output",
+                "schema": schema.json_schema(),
+                "strict": schema.is_strict_json_schema(),
+            },
+        },
+    }
+    if PRESCREEN_REASONING_EFFORT:
+        body["reasoning_effort"] = PRESCREEN_REASONING_EFFORT
+    return dumps_sorted({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": body,
+    })
+
+async def run_prescreening_bulk(
+    ctxs: List[StateContext],
+    poll_interval: float = PRESCREEN_BULK_POLL_SECONDS,
+) -> List[PreScreeningResult]:
+    """
+    Pre-screen a large, non-interactive set of features through the OpenAI Batch
+    API (JSONL upload, 24h completion window): half the per-token price of live
+    calls and separate rate limits, at the cost of asynchronous completion.
+    Cached features skip the job; features the job fails or omits are re-screened
+    with run_prescreening_batch. Each ctx gets its prescreening_result as
+    run_prescreening would set it. Results keep ctx order.
+    """
+    results: List[Optional[PreScreeningResult]] = [None] * len(ctxs)
+    keys: List[bytes] = []
+    lines: List[str] = []
+    for i, ctx in enumerate(ctxs):
+        prompt = render_prescreen_prompt(ctx)
+        keys.append(_prescreen_key(prompt))
+        cached = _result_cache_get(keys[i])
+        if cached is not None:
+            ctx.prescreening_result = results[i] = cached
+        else:
+            lines.append(_bulk_request_line(str(i), prompt))
+
+    if lines:
+        client = get_openai_client()
+        upload = await client.files.create(
+            file=("prescreening.jsonl", ("\n".join(lines) + "\n").encode()),
+            purpose="batch",
+        )
+        job = await client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("Pre-screening batch %s submitted: %d features", job.id, len(lines))
+        while job.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            job = await client.batches.retrieve(job.id)
+        logger.info("Pre-screening batch %s finished: %s", job.id, job.status)
+
+        if job.output_file_id:
+            output = await client.files.content(job.output_file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                row = loads(line)
+                response = row.get("response") or {}
+                if response.get("status_code") != 200 or not row.get("custom_id", "").isdigit():
+                    continue
+                i = int(row["custom_id"])
+                try:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    result = _result_schema().validate_json(content)
+                except (KeyError, IndexError, TypeError, ModelBehaviorError) as exc:
+                    logger.warning("Pre-screening batch row %s unusable: %s", i, exc)
+                    continue
+                if 0 <= i < len(ctxs) and results[i] is None:
+                    results[i] = _finish(ctxs[i], keys[i], result)
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        redo = await run_prescreening_batch([ctxs[i] for i in missing])
+        for i, r in zip(missing, redo):
+            results[i] = r
+    return results
+
 # ----------------- Integration Helpers -----------------
 def is_acceptable_for_compliance_analysis(result: PreScreeningResult) -> bool:
     """
@@ -184,7 +500,7 @@ def requires_legal_ethics_review(result: PreScreeningResult) -> bool:
     Determine if feature should be flagged for legal/ethics review due to discrimination risk.
     """
     return (result.classification == "problematic" or 
-            result.discrimination_risk in ["high", "medium"])
+            result.discrimination_risk in ("high", "medium"))
 
 def requires_human_evaluation(result: PreScreeningResult) -> bool:
     """
@@ -10,21 +10,29 @@ The Retrieval Agent:
 """
 
 import asyncio
-import json
+import logging
 import os
 import re
 import sys
-from typing import Any, Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from agents import Agent, RunContextWrapper, Runner, Tool, function_tool
 from app.agent.analysis_agent import Evidence, RetrievalNeed
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel, TypeAdapter
+from app.agent._prompting import compile_renderer
+from app.agent._streaming import ArrayItemScanner
 from app.agent.schemas.agents import StateContext
 from app.agent.evidence_web_search_agent import create_legal_evidence_search_agent
 
 load_dotenv()
 api_key = os.getenv('OPENAI_API_KEY')
+# Retrieval needs searched concurrently (one agent run per need).
+RETRIEVAL_CONCURRENCY = int(os.getenv("RETRIEVAL_CONCURRENCY", "8"))
+
+logger = logging.getLogger(__name__)
 # -------------------- Mock Knowledge Base --------------------
 # In production, this would connect to your actual KB/document system
 # MOCK_KB_DOCS = {
@@ -76,11 +84,12 @@ api_key = os.getenv('OPENAI_API_KEY')
 #     return results[:max_results]
 
 # -------------------- Retrieval Agent --------------------
-def retrieval_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
-    return """
+# Static instructions first (sent as the system prompt, identical on every run so
+# the provider's prompt cache can reuse it); the needs travel in the user message.
+RETRIEVAL_SYSTEM = """
 You are a Compliance Retrieval Agent.
 
-RETRIEVAL_NEEDS: {{retrieval_needs_json}}
+The user message gives RETRIEVAL_NEEDS.
 
 For each RetrievalNeed:
 1. Use kb_search for internal documents (pass must_tags and nice_to_have_tags)
@@ -111,6 +120,12 @@ Rules:
 - Return ONLY the JSON array, no extra text
 """.strip()
 
+def retrieval_prompt(_: RunContextWrapper[StateContext], __: Agent[StateContext]) -> str:
+    return RETRIEVAL_SYSTEM
+
+# Dynamic user message: compiled into a specialized render function once, at import.
+_render_retrieval = compile_renderer("RETRIEVAL_NEEDS: {{retrieval_needs_json}}")
+
 
 def create_retrieval_agent() -> Agent[StateContext]:
     web_search_agent = create_legal_evidence_search_agent()
@@ -128,6 +143,34 @@ def create_retrieval_agent() -> Agent[StateContext]:
 
 
 # -------------------- Runner Function --------------------
+@lru_cache(maxsize=1)
+def _needs_adapter() -> TypeAdapter:
+    """
+    Serializes a List[RetrievalNeed] straight to JSON in pydantic-core, skipping the
+    model_dump() dicts. Built on first use, so importing this module doesn't pay a schema build.
+    """
+    return TypeAdapter(List[RetrievalNeed])
+
+def _need_key(need: RetrievalNeed) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """Identity of a need for deduplication: normalized query plus tag sets."""
+    return (
+        " ".join(need.query.lower().split()),
+        tuple(sorted(set(need.must_tags))),
+        tuple(sorted(set(need.nice_to_have_tags))),
+    )
+
+def _unique_needs(retrieval_needs: List[RetrievalNeed]) -> List[RetrievalNeed]:
+    """First occurrence of each need by _need_key, in plan order."""
+    unique: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], RetrievalNeed] = {}
+    for need in retrieval_needs:
+        unique.setdefault(_need_key(need), need)
+    if len(unique) < len(retrieval_needs):
+        logger.debug("Retrieval needs deduplicated: %d -> %d", len(retrieval_needs), len(unique))
+    return list(unique.values())
+
+def _need_prompt(need: RetrievalNeed) -> str:
+    return _render_retrieval(retrieval_needs_json=_needs_adapter().dump_json([need]).decode())
+
 async def run_retrieval_agent(
     retrieval_agent: Agent[StateContext], 
     retrieval_needs: List[RetrievalNeed],
@@ -135,18 +178,76 @@ async def run_retrieval_agent(
 ) -> List[Evidence]:
     """
     Run the retrieval agent with a list of RetrievalNeed objects.
+    Needs that match up to query case/whitespace and tag order are searched once.
+    Each unique need gets its own agent run; the runs (and the searches they
+    trigger) overlap, bounded by RETRIEVAL_CONCURRENCY. Evidence is flattened in
+    need order with exact duplicates across needs dropped.
     Returns a list of Evidence objects.
     """
-    needs_json = json.dumps([need.model_dump() for need in retrieval_needs], indent=2)
-    prompt = retrieval_prompt(None, None).replace(
-        "{{retrieval_needs_json}}", needs_json
-    )
-    
-    result = await Runner.run(retrieval_agent, prompt, context=ctx)
+    sem = asyncio.Semaphore(RETRIEVAL_CONCURRENCY)
+
+    async def _one(need: RetrievalNeed) -> List[Evidence]:
+        async with sem:
+            result = await Runner.run(retrieval_agent, _need_prompt(need), context=ctx)
+        return result.final_output or []
+
+    per_need = await asyncio.gather(*(_one(need) for need in _unique_needs(retrieval_needs)))
+    evidence = list(dict.fromkeys(ev for found in per_need for ev in found))
     
     # Store evidence in context for downstream use
-    ctx.retrieved_evidence = result.final_output
-    return result.final_output
+    ctx.retrieved_evidence = evidence
+    return evidence
+
+async def stream_retrieval_agent(
+    retrieval_agent: Agent[StateContext],
+    retrieval_needs: List[RetrievalNeed],
+    ctx: StateContext
+) -> AsyncIterator[Evidence]:
+    """
+    Streaming variant of run_retrieval_agent: yields each Evidence as soon as its
+    JSON object is complete in any need's model output, instead of after every
+    run has finished. Items are yielded once, in arrival order. When all runs end,
+    ctx.retrieved_evidence is set exactly as run_retrieval_agent sets it.
+    """
+    sem = asyncio.Semaphore(RETRIEVAL_CONCURRENCY)
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def _one(need: RetrievalNeed) -> List[Evidence]:
+        try:
+            async with sem:
+                result = Runner.run_streamed(retrieval_agent, _need_prompt(need), context=ctx)
+                # List outputs are wrapped by the SDK as {"response": [...]}.
+                scanner = ArrayItemScanner("response")
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                        for item in scanner.feed(event.data.delta):
+                            queue.put_nowait(Evidence.model_validate(item))
+            return result.final_output or []
+        finally:
+            queue.put_nowait(done)
+
+    tasks = [asyncio.create_task(_one(need)) for need in _unique_needs(retrieval_needs)]
+    seen = set()
+    try:
+        pending = len(tasks)
+        while pending:
+            item = await queue.get()
+            if item is done:
+                pending -= 1
+            elif item not in seen:
+                seen.add(item)
+                yield item
+        per_need = [t.result() for t in tasks]  # re-raises a failed run
+    finally:
+        for t in tasks:
+            t.cancel()
+
+    evidence = list(dict.fromkeys(ev for found in per_need for ev in found))
+    for ev in evidence:  # anything the incremental scan could not pick out
+        if ev not in seen:
+            yield ev
+    ctx.retrieved_evidence = evidence
 
 
 
@@ -66,11 +66,14 @@ TEAM CONTRACT (frontend mapping)
 """
 
 from __future__ import annotations
-import json, math, re
+import math, re
+from functools import lru_cache
 from typing import List, Set, Tuple, Optional, Literal
 from urllib.parse import urlparse
 
 from agents import Agent, Runner, RunContextWrapper
+from app.agent._json import dumps_sorted
+from app.agent._prompting import compile_renderer
 from app.agent.schemas.agents import StateContext
 from app.agent.schemas.analysis import AnalysisFindings, Evidence, Finding, OpenQuestion
 from app.agent.schemas.reviews import DecisionRecord
@@ -253,6 +256,9 @@ Guidance:
 - Derive citations ONLY from the evidence in ANALYSIS_FINDINGS_JSON.
 """.strip()
 
+# Static template: compiled into a specialized render function once, at import.
+_render_review = compile_renderer(reviewer_prompt(None, None))
+
 def create_llm_reviewer() -> Agent[StateContext]:
     return Agent[StateContext](
         name="Reviewer (LLM)",
@@ -262,6 +268,11 @@ def create_llm_reviewer() -> Agent[StateContext]:
         model="gpt-5-nano",  # don't pass temperature/top_p
     )
 
+@lru_cache(maxsize=1)
+def _shared_reviewer() -> Agent[StateContext]:
+    """Agents are stateless config, so run_reviewer reuses one instance."""
+    return create_llm_reviewer()
+
 # ----------------- Guardrails & alignment -----------------
 def _align_to_rules(llm: DecisionRecord, af: AnalysisFindings) -> DecisionRecord:
     """
@@ -374,12 +385,10 @@ async def run_reviewer(ctx: StateContext) -> DecisionRecord:
         raise ValueError("Reviewer: ctx.analysis_findings is missing")
 
     feature_desc = ctx.feature_description or ""
-    findings_json = json.dumps(ctx.analysis_findings.model_dump(), sort_keys=True)
+    findings_json = dumps_sorted(ctx.analysis_findings.model_dump())
 
-    agent = create_llm_reviewer()
-    prompt = (reviewer_prompt(None, None)
-              .replace("{{feature_desc}}", feature_desc)
-              .replace("{{findings_json}}", findings_json))
+    agent = _shared_reviewer()
+    prompt = _render_review(feature_desc=feature_desc, findings_json=findings_json)
     res = await Runner.run(agent, prompt, context=ctx)
 
     # Align with rules
@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from app.agent.schemas.reviews import DecisionRecord
 
@@ -28,4 +28,13 @@ class StateContext(BaseModel):
     retrieved_evidence: List[Evidence] = []
     analysis_findings: Optional[AnalysisFindings] = None
     decision_record: Optional[DecisionRecord] = None
-    prescreening_result: Optional[PreScreenResult] = None
\ No newline at end of file
+    prescreening_result: Optional[PreScreenResult] = None
+
+    # Private (not serialized): (jargon object, its prompt JSON) for reuse across agents
+    _jargon_json_cache: Optional[Tuple[Any, str]] = None
+    # Private: (evidence list, its prompt JSON), reused when the synth step re-runs
+    _evidence_json_cache: Optional[Tuple[Any, str]] = None
+    # Private: (jargon object, tag text, TagBundle) derived for this feature
+    _tags_cache: Optional[Tuple[Any, str, Any]] = None
+    # Private: rendered prompts keyed by (prompt_id, *values), reused on retries
+    _prompt_cache: Dict[Tuple[str, ...], str] = PrivateAttr(default_factory=dict)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Literal, Optional
 
 class RetrievalNeed(BaseModel):
@@ -18,7 +18,10 @@ class Evidence(BaseModel):
     - kind: 'doc' for KB hits or 'web' for online sources
     - ref: 'doc:{id}#p12' or a URL
     - snippet: short extract containing the relevant claim
+    Frozen: never mutated after retrieval, and hashable so it can key caches.
     """
+    model_config = ConfigDict(frozen=True)
+
     kind: Literal["doc","web"]
     ref: str
     snippet: str
@@ -46,6 +49,19 @@ class AnalysisPlan(BaseModel):
     """
     retrieval_needs: List[RetrievalNeed]
 
+class FeaturePlan(BaseModel):
+    """
+    One feature's plan inside a PlanBatch; matched back to its input by feature_id.
+    """
+    feature_id: str
+    retrieval_needs: List[RetrievalNeed]
+
+class PlanBatch(BaseModel):
+    """
+    Batch planner output: one FeaturePlan per feature in the batched prompt.
+    """
+    plans: List[FeaturePlan]
+
 class AnalysisFindings(BaseModel):
     """
     Synthesizer output. Downstream components (Reviewer / Report Agent) consume this.
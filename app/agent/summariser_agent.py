@@ -33,6 +33,10 @@ class FEEnvelope(BaseModel):
     terminating: bool = True
     ui: FEUI
 
+# State bill citations ("SB 976", "sb976") in the lower-cased feature text;
+# compiled once here rather than looked up in re's cache on every envelope.
+_STATE_BILL = re.compile(r"\b(sb ?\d{3,})\b")
+
 # ---------- Helpers ----------
 def _map_decision_to_ui(decision: str, hitl: bool) -> FEUI:
     """
@@ -72,7 +76,7 @@ def _infer_regulation_tag(ctx: StateContext, dr: DecisionRecord) -> Optional[str
         return "GDPR"
     if "oag.utah.gov" in joined or "utah" in text:
         return "Utah Social Media Regulation Act"
-    m = re.search(r"\b(sb ?\d{3,})\b", text, flags=re.I)
+    m = _STATE_BILL.search(text)
     if m:
         return m.group(1).upper().replace(" ", "")
 
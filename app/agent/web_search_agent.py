@@ -8,10 +8,12 @@ import os
 import re
 from typing import List
 
-import aiohttp
+import httpx
 from agents import Agent, RunContextWrapper, function_tool
 from openai import AsyncOpenAI
 from dotenv import load_dotenv
+from app.agent._clients import get_openai_client, serper_session
+from app.agent._json import loads
 from app.agent.schemas.evidence import Evidence, Finding, RetrievalNeed
 from app.agent.schemas.jargons import JargonSearchDetail, Source
 
@@ -61,12 +63,16 @@ async def _get_llm_summary(client: AsyncOpenAI, term: str, raw_results: str) ->
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
-        logger.info(f"❌ LLM summarization failed for {term}: {e}")
+        logger.info("❌ LLM summarization failed for %s: %s", term, e)
         return "Definition not available."
 
 
 async def _single_request(
-    client: AsyncOpenAI, query: str, max_retries: int, retry_delay: int
+    session: httpx.AsyncClient,
+    client: AsyncOpenAI,
+    query: str,
+    max_retries: int,
+    retry_delay: int,
 ):
     """Handles a single Serper API search and summarization request."""
     api_key = os.getenv("SERPER_API_KEY")
@@ -80,25 +86,23 @@ async def _single_request(
 
     for attempt in range(max_retries):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://google.serper.dev/search", json=payload, headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        raw_results = _format_serper_results(data, query)
-                        break
-                    elif response.status in [429, 500, 502, 503, 504]:
-                        await asyncio.sleep(retry_delay)
+            response = await session.post(
+                "https://google.serper.dev/search", json=payload, headers=headers
+            )
+            if response.status_code == 200:
+                raw_results = _format_serper_results(loads(response.content), query)
+                break
+            elif response.status_code in [429, 500, 502, 503, 504]:
+                await asyncio.sleep(retry_delay)
         except Exception:
             await asyncio.sleep(retry_delay)
 
-    logger.info(f"🔍 Search results for '{query}' obtained")
+    logger.info("🔍 Search results for '%s' obtained", query)
     if raw_results and not raw_results.startswith("❌"):
-        logger.info(f"📝 Summarizing results for '{query}'")
+        logger.info("📝 Summarizing results for '%s'", query)
         summary = await _get_llm_summary(client, query, raw_results)
         # sources = _extract_sources(raw_results)
-        logger.info(f"✅ Summary for '{query}': {summary[:60]}...")
+        logger.info("✅ Summary for '%s': %s...", query, summary[:60])
         # return JargonSearchDetail(term=query, definition=summary, sources=sources)
         return JargonSearchDetail(term=query, definition=summary)
     else:
@@ -116,21 +120,23 @@ async def multi_serper_search(
     Performs parallel Serper API searches and summarizes them using a manual LLM call.
     Returns a list of JargonSearchDetail objects.
     """
-    logger.info(f"🌐 Starting parallel searches for {len(terms)} terms.")
+    logger.info("🌐 Starting parallel searches for %s terms.", len(terms))
 
-    openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    openai_client = get_openai_client()
 
-    tasks = [
-        _single_request(openai_client, term, max_retries, retry_delay) for term in terms
-    ]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async with serper_session() as session:
+        tasks = [
+            _single_request(session, openai_client, term, max_retries, retry_delay)
+            for term in terms
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
     processed_results = []
     for res in results:
         if isinstance(res, JargonSearchDetail):
             processed_results.append(res)
         else:
-            logger.info(f"❌ Failed to process term, skipping: {res}")
+            logger.info("❌ Failed to process term, skipping: %s", res)
 
     # Append the processed results to the context
     if ctx and ctx.context and ctx.context.jargon_translation:
@@ -144,9 +150,11 @@ async def multi_serper_search(
             if term_detail.term not in searched_terms_set
         ]
 
-    logger.info(
-        f"✅ Updated context: {ctx.context.jargon_translation.model_dump_json()}"
-    )
+    # Serializing the whole translation is only worth it when someone reads it
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "✅ Updated context: %s", ctx.context.jargon_translation.model_dump_json()
+        )
 
     return processed_results
 
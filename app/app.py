@@ -10,6 +10,8 @@ from app.config import CONFIG_AGENT_SERVICE
 from app.core.config import Settings, get_settings
 from app.services.agent_service import AgentService
 from app.database.db import close_db_client
+from app.agent._clients import get_openai_client
+from agents import set_default_openai_client
 
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,9 @@ async def lifespan(app: FastAPI):
     """Application lifespan event handler."""
     logger.info("Starting application...")
 
+    # All agents share one pooled OpenAI client (keep-alive across LLM calls)
+    set_default_openai_client(get_openai_client())
+
     setattr(app.state, CONFIG_AGENT_SERVICE, AgentService())
 
     # TODO: Any client initialization can be done here
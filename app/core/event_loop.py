@@ -0,0 +1,27 @@
+import asyncio
+import logging
+import sys
+
+logger = logging.getLogger("scripts")
+
+
+def install_event_loop_policy() -> str:
+    """Install the fastest available event loop policy; returns its name."""
+    # io_uring loop (Linux 5.11+), then uvloop, else stock asyncio
+    if sys.platform == "linux":
+        try:
+            import uringcore
+
+            asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+            logger.info("Using io_uring event loop (uringcore)")
+            return "uringcore"
+        except Exception as e:  # not installed, or kernel without io_uring
+            logger.debug("uringcore unavailable: %s", e)
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 from enum import StrEnum
@@ -20,23 +21,21 @@ from agents import (
 from openai.types.responses import ResponseContentPartDoneEvent, ResponseTextDeltaEvent
 from pydantic import BaseModel
 
-from app.agent.pre_screen_agent import create_llm_prescreener, run_prescreening
+from app.agent.pre_screen_agent import create_llm_prescreener, render_prescreen_prompt, run_prescreening
 from app.agent.analysis_agent import create_analysis_planner, create_analysis_synthesizer
-from app.agent.jargen_agent import create_jargon_agent
+from app.agent.jargen_agent import create_jargon_agent, translate_known_jargon
 from app.agent.analysis_agent import (
     StateContext as AnalysisStateContext,
     Evidence,
     AnalysisPlan,
-    AnalysisFindings,
     create_analysis_planner,
     create_analysis_synthesizer,
     run_planner,
-    run_synthesizer,
+    stream_synthesizer,
 )
 from app.agent.retriever_agent import create_retrieval_agent, run_retrieval_agent
 from app.agent.review_agent import create_llm_reviewer, run_reviewer
 from app.agent.schemas.agents import StateContext
-from app.agent.schemas.pre_screen_result import PreScreenResult
 from app.agent.summariser_agent import run_summariser
 from app.schemas.agent import AgentStreamResponse
 
@@ -120,6 +119,21 @@ class AgentService:
         }
         return agents
 
+    async def _run_jargon(self, ctx: StateContext) -> None:
+        """Run the Jargon Agent and store its result on ctx.jargon_translation."""
+        # All jargon already in the internal DB: look it up locally, no LLM round-trips
+        known = translate_known_jargon(ctx.feature_name or "", ctx.feature_description or "")
+        if known is not None:
+            ctx.jargon_translation = known.model_dump()
+            return
+        prompt = (
+            "You are given a feature artifact. Extract terms and follow instructions.\n"
+            f"FEATURE_NAME: {ctx.feature_name}\nFEATURE_DESC: {ctx.feature_description}\n"
+            "Return ONLY the StandardizedFeature JSON."
+        )
+        res = await Runner.run(self.jargon_agent, prompt, context=RunContextWrapper(context=ctx))
+        ctx.jargon_translation = res.final_output.model_dump() if hasattr(res.final_output, "model_dump") else res.final_output
+
     async def run_full_workflow(
         self,
         ctx: StateContext,
@@ -131,9 +145,15 @@ class AgentService:
         
         logger.info(f"Starting analysis workflow for feature_id: {ctx.feature_id} with agent: {ctx.current_agent}")
 
+        pre_screen_task: Optional[asyncio.Task] = None
+        pre_screen_awaited = False
         try:
-            
-            logger.info("Step 1: Pre-screening")
+            # Validate and render the pre-screen input before any other work: invalid
+            # input fails fast, and the prompt is fixed now, before the jargon step
+            # fills ctx.jargon_translation, so it doesn't depend on which jargon path runs.
+            pre_screen_prompt = render_prescreen_prompt(ctx)
+
+            logger.info("Step 1+2: Pre-screening and Jargon Agent")
             # Stage 1: Pre-screen Agent
             yield AgentStreamResponse(
                 agent_name="pre_screen_agent",
@@ -142,9 +162,6 @@ class AgentService:
                 message="⚡ Quick pre-checks…",
                 terminating=False
             )
-            pre_screen: PreScreenResult = await run_prescreening(ctx)
-
-            logger.info("Step 2: Jargon Agent")
             # Stage 2: Jargon Agent
             yield AgentStreamResponse(
                 agent_name="jargon_agent",
@@ -153,13 +170,13 @@ class AgentService:
                 message="🔎 Expanding & normalising jargon…",
                 terminating=False
             )
-            prompt = (
-                "You are given a feature artifact. Extract terms and follow instructions.\n"
-                f"FEATURE_NAME: {ctx.feature_name}\nFEATURE_DESC: {ctx.feature_description}\n"
-                "Return ONLY the StandardizedFeature JSON."
-            )
-            res = await Runner.run(self.jargon_agent, prompt, context=RunContextWrapper(context=ctx))
-            ctx.jargon_translation = res.final_output.model_dump() if hasattr(res.final_output, "model_dump") else res.final_output
+            # Pre-screening reads the raw feature text and nothing downstream reads
+            # its result before review, so it runs in the background alongside
+            # jargon, planning, retrieval and synthesis. The planner does need the
+            # jargon result (expanded terms drive its tags), so that step stays
+            # sequential.
+            pre_screen_task = asyncio.create_task(run_prescreening(ctx, pre_screen_prompt))
+            await self._run_jargon(ctx)
 
             logger.info("Step 3: Analysis Planning")
             # Stage 3: Analysis Planning
@@ -197,7 +214,17 @@ class AgentService:
                 message="🧩 Synthesising findings…",
                 terminating=False
             )
-            findings: AnalysisFindings = await run_synthesizer(self.analysis_synth, feature_payload, evidence, ctx)
+            # Findings stream in as the model writes them; surface each one early.
+            n = 0
+            async for finding in stream_synthesizer(self.analysis_synth, feature_payload, evidence, ctx):
+                n += 1
+                yield AgentStreamResponse(
+                    agent_name="analysis_synthesizer",
+                    event="stage",
+                    stage="analysis-synthesis",
+                    message=f"🧩 Finding {n}: {finding.key_point}",
+                    terminating=False
+                )
 
             logger.info("Step 6: Review")
             # Stage 6: Review
@@ -208,6 +235,8 @@ class AgentService:
                 message="✅ Reviewing & scoring decision…",
                 terminating=False
             )
+            pre_screen_awaited = True
+            await pre_screen_task
             decision = await run_reviewer(ctx)
 
             logger.info("Step 7: Summarisation")
@@ -238,6 +267,18 @@ class AgentService:
                 payload={"type": exc.__class__.__name__, "message": str(exc)},
                 terminating=True
             )
+        finally:
+            # Don't leave the background pre-screen running after an error/disconnect.
+            # If it finished with an error nobody awaited (another step raised first),
+            # log it; if it was awaited, the error path above already reported it, so
+            # only retrieve it to keep asyncio from warning it was never retrieved.
+            if pre_screen_task is not None:
+                if not pre_screen_task.done():
+                    pre_screen_task.cancel()
+                elif not pre_screen_task.cancelled():
+                    pre_screen_exc = pre_screen_task.exception()
+                    if pre_screen_exc is not None and not pre_screen_awaited:
+                        logger.warning("Background pre-screening failed: %r", pre_screen_exc)
 
 
     # TODO: more detailed streaming workflow if required in the future :D